@@ -0,0 +1,186 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import (
+    BaseAuthentication,
+    BasicAuthentication,
+    SessionAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from accounts.cache import (
+    basic_credentials_key,
+    cache_user,
+    get_basic_auth_cache_timeout,
+    get_cached_user,
+)
+
+# Claims embedded by CustomTokenObtainPairSerializer. Their presence tells a
+# token that can be turned into a token user without touching the database.
+USER_CLAIMS = ("email", "is_staff", "is_superuser", "is_verified")
+
+
+class ClaimsUser(TokenUser):
+    """
+    Token user exposing the embedded claims, with its id converted back to
+    the type of the user model's primary key so it compares equal to
+    foreign keys such as Task.user_id.
+    """
+
+    @cached_property
+    def id(self):
+        return get_user_model()._meta.pk.to_python(
+            self.token[api_settings.USER_ID_CLAIM]
+        )
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def is_verified(self):
+        return self.token.get("is_verified", False)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user without a query per request.
+
+    The user is read from the cache and only loaded from the database on a
+    miss; the entry lives for ACCOUNTS_USER_CACHE_TIMEOUT seconds and is
+    dropped whenever the user is saved or deleted.
+
+    With ACCOUNTS_JWT_TOKEN_USER enabled, tokens carrying the claims of
+    CustomTokenObtainPairSerializer are turned into a ClaimsUser instead.
+    Such a user is never looked up, so deactivation and password changes
+    only take effect once its access token expires, and it can only be
+    used by views that refer to the user by id.
+    """
+
+    def get_user(self, validated_token):
+        if getattr(settings, "ACCOUNTS_JWT_TOKEN_USER", False) and all(
+            claim in validated_token for claim in USER_CLAIMS
+        ):
+            return ClaimsUser(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache_user(user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed",
+            )
+        return user
+
+
+def load_user(user_id):
+    """
+    Return the user with the given id from the cache, or from the database
+    on a miss, None if there is no such user.
+    """
+    user = get_cached_user(user_id)
+    if user is None:
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is not None:
+            cache_user(user)
+    return user
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    Basic authentication that only runs the password hasher once per
+    ACCOUNTS_BASIC_AUTH_CACHE_TIMEOUT seconds for the same credentials.
+
+    Verified credentials are remembered under an HMAC of them, along with
+    the password hash they were verified against. A repeated call is
+    accepted without hashing as long as the user, read through the user
+    cache, still has that password hash and is active, so a password change
+    or deactivation takes effect immediately.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = basic_credentials_key(userid, password)
+        verified = cache.get(key)
+        if verified is not None:
+            user_id, password_hash = verified
+            user = load_user(user_id)
+            if (
+                user is not None
+                and user.is_active
+                and user.password == password_hash
+            ):
+                return (user, None)
+            cache.delete(key)
+
+        user, auth = super().authenticate_credentials(
+            userid, password, request
+        )
+        cache.set(
+            key, (user.pk, user.password), get_basic_auth_cache_timeout()
+        )
+        return (user, auth)
+
+
+class SchemeAuthentication(BaseAuthentication):
+    """
+    Authenticates a request with exactly one authenticator, selected by
+    the scheme of its Authorization header.
+
+    Basic, Token and Bearer credentials go to their own authenticator
+    only, instead of walking through every configured class; requests
+    without an Authorization header use the session. Unknown schemes are
+    left unauthenticated.
+    """
+
+    authenticators = {
+        b"basic": CachedBasicAuthentication,
+        b"token": TokenAuthentication,
+        b"bearer": CachedJWTAuthentication,
+    }
+    default_authenticator = SessionAuthentication
+
+    def get_authenticator(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth:
+            return self.default_authenticator()
+        authenticator = self.authenticators.get(auth[0].lower())
+        return authenticator() if authenticator else None
+
+    def authenticate(self, request):
+        authenticator = self.get_authenticator(request)
+        if authenticator is None:
+            return None
+        return authenticator.authenticate(request)
+
+    def authenticate_header(self, request):
+        authenticator = self.get_authenticator(request)
+        if authenticator is None or isinstance(
+            authenticator, SessionAuthentication
+        ):
+            authenticator = self.authenticators[b"basic"]()
+        return authenticator.authenticate_header(request)
@@ -1,10 +1,207 @@
-from threading import Thread
+import logging
+import os
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import sleep
 
-class EmailThread(Thread):
-    """Sends an email in a separate thread."""
-    def __init__(self, email_obj):
-        Thread.__init__(self)
-        self.email_obj = email_obj
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
 
-    def run(self):
-        self.email_obj.send()
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+EMAIL_QUEUE_DEFAULTS = {
+    "WORKERS": 2,
+    "MAXSIZE": 1000,
+    "BATCH_SIZE": 20,
+    "RETRIES": 3,
+    "BACKOFF": 1.0,
+    "PUT_TIMEOUT": 1.0,
+}
+
+
+def get_email_queue_setting(name):
+    return getattr(settings, "EMAIL_QUEUE", {}).get(
+        name, EMAIL_QUEUE_DEFAULTS[name]
+    )
+
+
+def send_messages(messages, retries=0, backoff=0):
+    """
+    Send messages over a single connection, retrying the failed ones with
+    exponential backoff.
+
+    Returns:
+        tuple: The number of sent messages and the list of failed ones.
+    """
+    sent = 0
+    pending = list(messages)
+    for attempt in range(retries + 1):
+        if attempt:
+            sleep(backoff * 2 ** (attempt - 1))
+        failed = []
+        connection = get_connection()
+        try:
+            connection.open()
+            for message in pending:
+                try:
+                    connection.send_messages([message])
+                    sent += 1
+                except Exception:
+                    failed.append(message)
+        except Exception:
+            # The connection itself could not be opened.
+            failed = list(pending)
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        if not failed:
+            return sent, []
+        logger.warning(
+            "Sending %d emails failed (attempt %d)", len(failed), attempt + 1
+        )
+        pending = failed
+    return sent, pending
+
+
+class EmailQueue:
+    """
+    Sends emails from a bounded queue drained by a fixed pool of threads.
+
+    Each worker takes up to BATCH_SIZE queued messages at once and sends
+    them over one SMTP connection. Failed messages are retried with
+    exponential backoff. When the queue is full, messages are dropped
+    after PUT_TIMEOUT seconds instead of piling up without bound.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.pid = None
+        self.sent = self.failed = self.dropped = 0
+
+    def start(self):
+        """
+        Start the worker threads once per process, so that a queue created
+        before a server forks its workers still works in every child.
+        """
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.queue = Queue(get_email_queue_setting("MAXSIZE"))
+            for _ in range(get_email_queue_setting("WORKERS")):
+                Thread(target=self.work, daemon=True).start()
+
+    def put(self, message):
+        """
+        Queue a message for sending.
+
+        Returns:
+            bool: False if the queue was full and the message was dropped.
+        """
+        self.start()
+        try:
+            self.queue.put(
+                message, timeout=get_email_queue_setting("PUT_TIMEOUT")
+            )
+        except Full:
+            with self.lock:
+                self.dropped += 1
+            logger.error("Email queue is full, dropping message")
+            return False
+        return True
+
+    def work(self):
+        batch_size = get_email_queue_setting("BATCH_SIZE")
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            try:
+                sent, failed = send_messages(
+                    batch,
+                    retries=get_email_queue_setting("RETRIES"),
+                    backoff=get_email_queue_setting("BACKOFF"),
+                )
+            except Exception:
+                logger.exception("Email worker failed")
+                sent, failed = 0, batch
+            with self.lock:
+                self.sent += sent
+                self.failed += len(failed)
+            for _ in batch:
+                self.queue.task_done()
+
+    def join(self):
+        """
+        Block until every queued message has been handled.
+        """
+        if self.pid == os.getpid():
+            self.queue.join()
+
+    def stats(self):
+        """
+        Return the queue depth and the sent, failed and dropped counters.
+        """
+        started = self.pid == os.getpid()
+        return {
+            "depth": self.queue.qsize() if started else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+email_queue = EmailQueue()
+
+
+def serialize_message(message):
+    """
+    Return a JSON serializable copy of a rendered message for Celery.
+    """
+    return {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": message.to,
+        "cc": message.cc,
+        "bcc": message.bcc,
+        "reply_to": message.reply_to,
+        "headers": message.extra_headers,
+        "alternatives": [
+            list(alternative)
+            for alternative in getattr(message, "alternatives", [])
+        ],
+        "content_subtype": message.content_subtype,
+    }
+
+
+def deserialize_message(data):
+    data = dict(data)
+    content_subtype = data.pop("content_subtype", "plain")
+    message = EmailMultiAlternatives(**data)
+    message.content_subtype = content_subtype
+    return message
+
+
+def send_email(message):
+    """
+    Hand a message to the configured dispatcher instead of sending it in
+    the request thread.
+
+    EMAIL_DISPATCH_BACKEND selects "thread" (the process wide EmailQueue)
+    or "celery" (the send_email_batch task on the Celery workers).
+    """
+    if hasattr(message, "render") and not message.is_rendered:
+        message.render()
+    backend = getattr(settings, "EMAIL_DISPATCH_BACKEND", "thread")
+    if backend == "celery":
+        from accounts.tasks import send_email_batch
+
+        send_email_batch.delay([serialize_message(message)])
+        return True
+    return email_queue.put(message)
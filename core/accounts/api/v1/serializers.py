@@ -225,9 +225,29 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom serializer for obtaining a token pair.
 
-    Includes the user's email in the token response.
+    Includes the user's email in the token response, and embeds the
+    email and the staff, superuser and verified flags in the tokens, so
+    that CachedJWTAuthentication can build a token user from them.
     """
 
+    @classmethod
+    def get_token(cls, user):
+        """
+        Create a token for the user with the user claims embedded.
+
+        Args:
+            user (User): The user the token is issued for.
+
+        Returns:
+            Token: The refresh token, whose access tokens inherit the claims.
+        """
+        token = super().get_token(user)
+        token["email"] = user.email
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        token["is_verified"] = user.is_verified
+        return token
+
     def validate(self, attrs):
         """
         Validate the provided email and password and return the user object and token pair.
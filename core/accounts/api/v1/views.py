@@ -11,7 +11,7 @@ from django.contrib.auth import get_user_model
 from rest_framework.authtoken.models import Token 
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.views import TokenObtainPairView
-from ..utils import EmailThread
+from ..utils import send_email
 from .serializers import (
     RegistrationSerializer,
     ResendEmailConfirmSerializer,
@@ -65,7 +65,7 @@ class RegistrationView(generics.GenericAPIView):
                 to=recipient_list,
             )
 
-            EmailThread(email_obj).start()
+            send_email(email_obj)
 
             return Response(data, status=status.HTTP_201_CREATED)
 
@@ -162,7 +162,7 @@ class EmailResendConfirmView(generics.GenericAPIView):
             to=recipient_list,
         )
 
-        EmailThread(email_obj).start()
+        send_email(email_obj)
 
         return Response({"detail": "Pleas check your email"})
 
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.crypto import salted_hmac
+
+USER_KEY = "accounts:user:{user_id}"
+BASIC_KEY = "accounts:basic:{digest}"
+
+
+def get_user_cache_timeout():
+    return getattr(settings, "ACCOUNTS_USER_CACHE_TIMEOUT", 60)
+
+
+def get_basic_auth_cache_timeout():
+    return getattr(settings, "ACCOUNTS_BASIC_AUTH_CACHE_TIMEOUT", 60)
+
+
+def basic_credentials_key(userid, password):
+    """
+    Return the cache key of a pair of Basic credentials.
+
+    The credentials are hashed with an HMAC keyed on SECRET_KEY, so neither
+    the password nor a plain hash of it ever reaches the cache.
+    """
+    digest = salted_hmac(
+        "accounts.basic",
+        "%s\0%s" % (userid, password),
+        algorithm="sha256",
+    ).hexdigest()
+    return BASIC_KEY.format(digest=digest)
+
+
+def get_cached_user(user_id):
+    """
+    Return the cached user with the given id, None on a miss.
+    """
+    return cache.get(USER_KEY.format(user_id=user_id))
+
+
+def cache_user(user):
+    cache.set(
+        USER_KEY.format(user_id=user.pk), user, get_user_cache_timeout()
+    )
+
+
+def invalidate_user(user_id):
+    """
+    Drop a user from the cache.
+
+    The entry is dropped right away and again once the current transaction
+    commits, so a concurrent request can not keep the pre-commit row cached.
+    """
+    key = USER_KEY.format(user_id=user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,172 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import BoundedSemaphore, Lock
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+    make_password,
+)
+
+PASSWORD_HASHING_DEFAULTS = {
+    "PROFILE": "pbkdf2",
+    "PBKDF2_ITERATIONS": PBKDF2PasswordHasher.iterations,
+    "ARGON2_TIME_COST": Argon2PasswordHasher.time_cost,
+    "ARGON2_MEMORY_COST": Argon2PasswordHasher.memory_cost,
+    "ARGON2_PARALLELISM": Argon2PasswordHasher.parallelism,
+    "BCRYPT_ROUNDS": BCryptSHA256PasswordHasher.rounds,
+    "MAX_WORKERS": 4,
+}
+
+
+def get_hashing_setting(name):
+    return getattr(settings, "ACCOUNTS_PASSWORD_HASHING", {}).get(
+        name, PASSWORD_HASHING_DEFAULTS[name]
+    )
+
+
+class HashingPool:
+    """
+    Bounds the number of passwords hashed at once in a process.
+
+    Hashing is pure CPU work: past MAX_WORKERS concurrent hashes, extra
+    ones only slow every login down. The pool also owns the executor the
+    async helpers hash on, so they never block an event loop.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.pid = None
+
+    def start(self):
+        # Once per process, so a pool created before a server forks its
+        # workers still works in every child.
+        with self.lock:
+            if self.pid != os.getpid():
+                workers = get_hashing_setting("MAX_WORKERS")
+                self.slots = BoundedSemaphore(workers)
+                self.executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="password-hashing"
+                )
+                self.pid = os.getpid()
+
+    def acquire(self):
+        self.start()
+        self.slots.acquire()
+
+    def release(self):
+        self.slots.release()
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run func on the hashing executor and wait for it on the event loop.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, partial(func, *args, **kwargs)
+        )
+
+
+hashing_pool = HashingPool()
+
+
+class BoundedHasherMixin:
+    """
+    Takes a slot of the hashing pool for every hash computation.
+
+    verify() of the PBKDF2 and bcrypt hashers goes through encode(), so
+    only encode() needs a slot there.
+    """
+
+    def encode(self, *args, **kwargs):
+        hashing_pool.acquire()
+        try:
+            return super().encode(*args, **kwargs)
+        finally:
+            hashing_pool.release()
+
+
+class TunedPBKDF2PasswordHasher(BoundedHasherMixin, PBKDF2PasswordHasher):
+    """
+    PBKDF2 with the iterations of ACCOUNTS_PASSWORD_HASHING.
+
+    Hashes with other iterations are rehashed on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return get_hashing_setting("PBKDF2_ITERATIONS")
+
+
+class TunedArgon2PasswordHasher(BoundedHasherMixin, Argon2PasswordHasher):
+    """
+    Argon2 with the time cost, memory cost and parallelism of
+    ACCOUNTS_PASSWORD_HASHING.
+
+    Hashes with other parameters are rehashed on the next login.
+    """
+
+    @property
+    def time_cost(self):
+        return get_hashing_setting("ARGON2_TIME_COST")
+
+    @property
+    def memory_cost(self):
+        return get_hashing_setting("ARGON2_MEMORY_COST")
+
+    @property
+    def parallelism(self):
+        return get_hashing_setting("ARGON2_PARALLELISM")
+
+    def verify(self, password, encoded):
+        # Argon2 verifies without encode(), so it takes its own slot.
+        hashing_pool.acquire()
+        try:
+            return super().verify(password, encoded)
+        finally:
+            hashing_pool.release()
+
+
+class TunedBCryptSHA256PasswordHasher(
+    BoundedHasherMixin, BCryptSHA256PasswordHasher
+):
+    """
+    bcrypt with the rounds of ACCOUNTS_PASSWORD_HASHING.
+
+    Hashes with other rounds are rehashed on the next login.
+    """
+
+    @property
+    def rounds(self):
+        return get_hashing_setting("BCRYPT_ROUNDS")
+
+
+async def amake_password(password):
+    """
+    Async version of make_password, hashing on the hashing pool.
+    """
+    return await hashing_pool.run(make_password, password)
+
+
+async def acheck_password(user, raw_password):
+    """
+    Async version of user.check_password, hashing on the hashing pool.
+
+    Like check_password, it rehashes and saves the password when its
+    hasher or parameters are outdated.
+    """
+    return await hashing_pool.run(user.check_password, raw_password)
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    Async version of authenticate, running the backends on the hashing
+    pool.
+    """
+    return await hashing_pool.run(authenticate, request, **credentials)
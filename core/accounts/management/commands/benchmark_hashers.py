@@ -0,0 +1,45 @@
+from time import monotonic
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+PASSWORD = "a/123456"
+
+
+class Command(BaseCommand):
+    help = 'Measures the logins per second per core of each password hashing profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10, help='The number of logins to time per profile')
+        parser.add_argument('--profile', action='append', dest='profiles', help='A profile to measure, all available ones by default')
+
+    def handle(self, *args, **kwargs):
+        iterations = kwargs['iterations']
+        profiles = kwargs['profiles'] or list(settings.PASSWORD_HASHING_PROFILES)
+        unknown = set(profiles) - set(settings.PASSWORD_HASHING_PROFILES)
+        if unknown:
+            raise CommandError(
+                f'Unavailable profiles: {", ".join(sorted(unknown))}'
+            )
+        if iterations < 1:
+            raise CommandError('The number of iterations must be at least 1')
+
+        for profile in profiles:
+            hasher = import_string(settings.PASSWORD_HASHING_PROFILES[profile])()
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+            # A login verifies the password once, on a single core.
+            started = monotonic()
+            for _ in range(iterations):
+                hasher.verify(PASSWORD, encoded)
+            duration = monotonic() - started
+            parameters = ', '.join(
+                f'{name} {value}'
+                for name, value in hasher.safe_summary(encoded).items()
+                if name not in ('salt', 'hash')
+            )
+            self.stdout.write(self.style.SUCCESS(f'{profile:<8} {parameters}'))
+            self.stdout.write(self.style.SUCCESS(
+                f'{"":<8} {duration / iterations * 1000:.1f} ms per login, '
+                f'{iterations / duration:.1f} logins/s per core'
+            ))
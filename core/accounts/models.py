@@ -6,9 +6,11 @@ from django.contrib.auth.models import (
     BaseUserManager
 )
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from accounts.cache import invalidate_user
+
 
 class CustomUserManager(BaseUserManager):
     """
@@ -115,3 +117,15 @@ def save_profile(sender, instance, created, **kwargs):
 
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Signal receiver that drops a user from the authentication cache when
+    the user is saved, e.g. on a password change or deactivation, or
+    deleted.
+    """
+
+    invalidate_user(instance.pk)
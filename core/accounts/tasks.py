@@ -0,0 +1,27 @@
+from celery import shared_task
+
+from .api.utils import (
+    deserialize_message,
+    get_email_queue_setting,
+    send_messages,
+    serialize_message,
+)
+
+
+@shared_task(bind=True)
+def send_email_batch(self, messages):
+    """
+    Sends a batch of serialized emails over a single connection and retries
+    the failed ones with exponential backoff.
+    """
+    sent, failed = send_messages(
+        [deserialize_message(data) for data in messages]
+    )
+    retries = get_email_queue_setting("RETRIES")
+    if failed and self.request.retries < retries:
+        raise self.retry(
+            args=([serialize_message(message) for message in failed],),
+            countdown=get_email_queue_setting("BACKOFF")
+            * 2 ** self.request.retries,
+        )
+    return {"sent": sent, "failed": len(failed)}
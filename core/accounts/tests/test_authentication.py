@@ -0,0 +1,198 @@
+import base64
+from unittest import mock
+
+import pytest
+from django.contrib.auth import base_user
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..api.authentication import ClaimsUser
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+def user_query_count(context):
+    return len([
+        query for query in context.captured_queries
+        if 'FROM "accounts_customuser"' in query["sql"]
+    ])
+
+
+@pytest.mark.django_db()
+class TestCachedJWTAuthentication:
+    url = reverse("todo:api-v1:task-list")
+
+    def login(self, user_obj):
+        client = APIClient()
+        response = client.post(
+            reverse("accounts:api-v1:jwt-create"),
+            {"email": user_obj.email, "password": "test_password@123"},
+        )
+        client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + response.data["access"]
+        )
+        return client, response.data["access"]
+
+    def test_tokens_carry_user_claims(self, user_obj):
+        _, access = self.login(user_obj)
+        token = AccessToken(access)
+        assert token["email"] == user_obj.email
+        assert token["is_verified"] is True
+        assert token["is_staff"] is False
+
+    def test_user_is_loaded_once(self, user_obj):
+        client, _ = self.login(user_obj)
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(self.url).status_code == 200
+        assert user_query_count(context) == 1
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(self.url).status_code == 200
+        assert user_query_count(context) == 0
+
+    def test_deactivation_invalidates(
+        self, user_obj, django_capture_on_commit_callbacks
+    ):
+        client, _ = self.login(user_obj)
+        assert client.get(self.url).status_code == 200
+        with django_capture_on_commit_callbacks(execute=True):
+            user_obj.is_active = False
+            user_obj.save()
+        assert client.get(self.url).status_code == 401
+
+    def test_password_change_invalidates(
+        self, user_obj, django_capture_on_commit_callbacks
+    ):
+        client, _ = self.login(user_obj)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.put(
+                reverse("accounts:api-v1:change-password"),
+                {
+                    "old_password": "test_password@123",
+                    "new_password": "new_password@123",
+                    "new_password1": "new_password@123",
+                },
+            )
+        assert response.status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.url)
+        assert user_query_count(context) == 1
+
+    def test_token_user(self, user_obj, settings):
+        settings.ACCOUNTS_JWT_TOKEN_USER = True
+        client, _ = self.login(user_obj)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url)
+        assert response.status_code == 200
+        user = response.wsgi_request.user
+        assert isinstance(user, ClaimsUser)
+        assert user.id == user_obj.id
+        assert user.email == user_obj.email
+        assert user_query_count(context) == 0
+
+    def test_token_user_creates_tasks(self, user_obj, settings):
+        settings.ACCOUNTS_JWT_TOKEN_USER = True
+        client, _ = self.login(user_obj)
+        response = client.post(self.url, {"title": "first"})
+        assert response.status_code == 201
+        response = client.post(
+            reverse("todo:api-v1:task-bulk"),
+            {"create": [{"title": "second"}]},
+            format="json",
+        )
+        assert response.status_code == 200
+        assert sorted(
+            user_obj.task_set.values_list("title", flat=True)
+        ) == ["first", "second"]
+
+
+def basic(email, password):
+    credentials = base64.b64encode(f"{email}:{password}".encode()).decode()
+    return "Basic " + credentials
+
+
+@pytest.fixture
+def check_password():
+    with mock.patch.object(
+        base_user, "check_password", wraps=base_user.check_password
+    ) as check_password:
+        yield check_password
+
+
+@pytest.mark.django_db()
+class TestSchemeAuthentication:
+    url = reverse("todo:api-v1:task-list")
+
+    def get(self, authorization=None):
+        client = APIClient()
+        if authorization:
+            client.credentials(HTTP_AUTHORIZATION=authorization)
+        return client.get(self.url)
+
+    def test_basic_credentials_are_verified_once(
+        self, user_obj, check_password
+    ):
+        authorization = basic(user_obj.email, "test_password@123")
+        assert self.get(authorization).status_code == 200
+        assert self.get(authorization).status_code == 200
+        assert self.get(authorization).status_code == 200
+        assert check_password.call_count == 1
+
+    def test_wrong_basic_password_is_not_cached(
+        self, user_obj, check_password
+    ):
+        authorization = basic(user_obj.email, "wrong_password")
+        assert self.get(authorization).status_code == 401
+        assert self.get(authorization).status_code == 401
+        assert check_password.call_count == 2
+
+    def test_password_change_revokes_cached_basic_credentials(
+        self, user_obj, django_capture_on_commit_callbacks
+    ):
+        authorization = basic(user_obj.email, "test_password@123")
+        assert self.get(authorization).status_code == 200
+        with django_capture_on_commit_callbacks(execute=True):
+            user_obj.set_password("new_password@123")
+            user_obj.save()
+        assert self.get(authorization).status_code == 401
+
+    def test_token(self, user_obj, check_password):
+        token = Token.objects.create(user=user_obj)
+        assert self.get("Token " + token.key).status_code == 200
+        assert check_password.call_count == 0
+
+    def test_bearer_skips_the_other_authenticators(self, user_obj):
+        response = APIClient().post(
+            reverse("accounts:api-v1:jwt-create"),
+            {"email": user_obj.email, "password": "test_password@123"},
+        )
+        with mock.patch(
+            "rest_framework.authentication.TokenAuthentication.authenticate"
+        ) as token_authenticate:
+            assert self.get(
+                "Bearer " + response.data["access"]
+            ).status_code == 200
+        token_authenticate.assert_not_called()
+
+    def test_session(self, user_obj):
+        client = APIClient()
+        client.force_login(user_obj)
+        assert client.get(self.url).status_code == 200
+
+    def test_unknown_scheme(self, user_obj):
+        response = self.get("Digest whatever")
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"] == 'Basic realm="api"'
@@ -0,0 +1,119 @@
+from io import StringIO
+from threading import Lock, Thread
+from time import sleep
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, identify_hasher
+from django.core.management import call_command
+
+from ..hashers import (
+    TunedPBKDF2PasswordHasher,
+    aauthenticate,
+    acheck_password,
+    amake_password,
+    hashing_pool,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture
+def fast_hashing(settings):
+    settings.ACCOUNTS_PASSWORD_HASHING = {
+        "PBKDF2_ITERATIONS": 1000,
+        "MAX_WORKERS": 2,
+    }
+    hashing_pool.pid = None
+    yield settings.ACCOUNTS_PASSWORD_HASHING
+    hashing_pool.pid = None
+
+
+@pytest.fixture
+def user_obj(fast_hashing):
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+def iterations(user):
+    return identify_hasher(user.password).decode(user.password)["iterations"]
+
+
+@pytest.mark.django_db()
+class TestPasswordHashing:
+    def test_profile_parameters_are_used(self, user_obj):
+        assert isinstance(
+            identify_hasher(user_obj.password), TunedPBKDF2PasswordHasher
+        )
+        assert iterations(user_obj) == 1000
+
+    def test_rehash_on_login(self, user_obj, fast_hashing):
+        fast_hashing["PBKDF2_ITERATIONS"] = 2000
+        user = authenticate(
+            email="test_email@gmail.com", password="test_password@123"
+        )
+        assert user is not None
+        user.refresh_from_db()
+        assert iterations(user) == 2000
+
+    def test_wrong_password_is_not_rehashed(self, user_obj, fast_hashing):
+        fast_hashing["PBKDF2_ITERATIONS"] = 2000
+        assert authenticate(
+            email="test_email@gmail.com", password="wrong_password"
+        ) is None
+        user_obj.refresh_from_db()
+        assert iterations(user_obj) == 1000
+
+    def test_concurrent_hashing_is_bounded(self, fast_hashing, monkeypatch):
+        lock = Lock()
+        active = []
+        peak = []
+
+        def encode(self, password, salt, iterations=None):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            sleep(0.02)
+            with lock:
+                active.pop()
+            return "pbkdf2_sha256$1$%s$x" % salt
+
+        monkeypatch.setattr(PBKDF2PasswordHasher, "encode", encode)
+        hasher = TunedPBKDF2PasswordHasher()
+        threads = [
+            Thread(target=hasher.encode, args=("secret", hasher.salt()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(peak) <= 2
+
+    def test_async_helpers(self, user_obj):
+        assert async_to_sync(acheck_password)(user_obj, "test_password@123")
+        assert not async_to_sync(acheck_password)(user_obj, "wrong")
+        encoded = async_to_sync(amake_password)("secret")
+        assert identify_hasher(encoded).verify("secret", encoded)
+
+
+
+@pytest.mark.django_db(transaction=True)
+def test_aauthenticate(user_obj):
+    # The backends query the database from a hashing pool thread, outside
+    # of the test's transaction.
+    user = async_to_sync(aauthenticate)(
+        email="test_email@gmail.com", password="test_password@123"
+    )
+    assert user == user_obj
+
+
+def test_benchmark_command(fast_hashing):
+    out = StringIO()
+    call_command("benchmark_hashers", "--iterations", "2", stdout=out)
+    assert "pbkdf2" in out.getvalue()
+    assert "logins/s per core" in out.getvalue()
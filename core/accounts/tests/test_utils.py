@@ -0,0 +1,111 @@
+import pytest
+from celery import current_app
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..api import utils
+from ..api.utils import email_queue, send_email, send_messages
+
+
+class FlakyBackend(EmailBackend):
+    """
+    Locmem backend counting opened connections and failing the first
+    `failures` sends.
+    """
+
+    connections = 0
+    failures = 0
+
+    def open(self):
+        FlakyBackend.connections += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise OSError("connection reset")
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def flaky_backend(settings):
+    settings.EMAIL_BACKEND = "accounts.tests.test_utils.FlakyBackend"
+    FlakyBackend.connections = FlakyBackend.failures = 0
+    return FlakyBackend
+
+
+def message(i=0):
+    return EmailMessage(f"subject {i}", "body", "from@example.com", ["to@a.b"])
+
+
+class TestSendMessages:
+
+    def test_one_connection_per_batch(self, flaky_backend):
+        sent, failed = send_messages([message(i) for i in range(10)])
+        assert (sent, failed) == (10, [])
+        assert flaky_backend.connections == 1
+        assert len(mail.outbox) == 10
+
+    def test_retries_failed_messages(self, flaky_backend, monkeypatch):
+        delays = []
+        monkeypatch.setattr(utils, "sleep", delays.append)
+        flaky_backend.failures = 3
+        sent, failed = send_messages(
+            [message(i) for i in range(2)], retries=3, backoff=0.5
+        )
+        assert (sent, failed) == (2, [])
+        assert delays == [0.5, 1.0]
+        assert len(mail.outbox) == 2
+
+    def test_gives_up_after_retries(self, flaky_backend, monkeypatch):
+        monkeypatch.setattr(utils, "sleep", lambda delay: None)
+        flaky_backend.failures = 10
+        sent, failed = send_messages([message()], retries=2)
+        assert sent == 0
+        assert len(failed) == 1
+
+
+class TestEmailQueue:
+
+    def test_sends_queued_messages(self):
+        before = email_queue.stats()["sent"]
+        for i in range(5):
+            assert email_queue.put(message(i))
+        email_queue.join()
+        stats = email_queue.stats()
+        assert stats["sent"] - before == 5
+        assert stats["depth"] == 0
+        assert len(mail.outbox) == 5
+
+    def test_celery_dispatch(self, settings):
+        settings.EMAIL_DISPATCH_BACKEND = "celery"
+        app = current_app._get_current_object()
+        always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        try:
+            send_email(message())
+        finally:
+            app.conf.task_always_eager = always_eager
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].subject == "subject 0"
+
+
+@pytest.mark.django_db()
+class TestRegistrationEmail:
+    client = APIClient()
+
+    def test_registration_sends_confirmation(self):
+        url = reverse("accounts:api-v1:registration")
+        data = {
+            "email": "new_user@gmail.com",
+            "password": "test_password@123",
+            "password1": "test_password@123",
+        }
+        response = self.client.post(url, data, format="json")
+        assert response.status_code == 201
+        email_queue.join()
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ["new_user@gmail.com"]
@@ -0,0 +1,26 @@
+import pytest
+from celery import current_app
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start every test with an empty cache, so cached task lists and versions
+    never leak between tests that reuse the same primary keys.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def eager_celery():
+    """
+    Run celery tasks inline, in the calling process.
+    """
+    app = current_app._get_current_object()
+    always_eager = app.conf.task_always_eager
+    app.conf.task_always_eager = True
+    yield app
+    app.conf.task_always_eager = always_eager
@@ -0,0 +1,39 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """
+    A drop-in JSONParser decoding with orjson.
+
+    orjson only reads UTF-8 and always rejects NaN and Infinity, so the
+    stock parser is used for other encodings, when STRICT_JSON is turned
+    off and when orjson is not installed.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if (
+            orjson is None
+            or not self.strict
+            or codecs.lookup(encoding).name != "utf-8"
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % exc)
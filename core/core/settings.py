@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
+from celery.schedules import crontab
 from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -117,6 +119,42 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHING_PROFILE picks the hasher of new hashes; "argon2" and
+# "bcrypt" are only offered when their library is installed. Hashes made by
+# another profile or with other parameters are upgraded on the next login.
+# MAX_WORKERS bounds the passwords hashed at once per process.
+ACCOUNTS_PASSWORD_HASHING = {
+    "PROFILE": config("PASSWORD_HASHING_PROFILE", default="pbkdf2"),
+    "PBKDF2_ITERATIONS": 600000,
+    "ARGON2_TIME_COST": 2,
+    "ARGON2_MEMORY_COST": 19 * 1024,
+    "ARGON2_PARALLELISM": 1,
+    "BCRYPT_ROUNDS": 12,
+    "MAX_WORKERS": 4,
+}
+PASSWORD_HASHING_PROFILES = {
+    "pbkdf2": "accounts.hashers.TunedPBKDF2PasswordHasher",
+}
+if find_spec("argon2"):
+    PASSWORD_HASHING_PROFILES["argon2"] = (
+        "accounts.hashers.TunedArgon2PasswordHasher"
+    )
+if find_spec("bcrypt"):
+    PASSWORD_HASHING_PROFILES["bcrypt"] = (
+        "accounts.hashers.TunedBCryptSHA256PasswordHasher"
+    )
+PASSWORD_HASHERS = list(dict.fromkeys([
+    PASSWORD_HASHING_PROFILES.get(
+        ACCOUNTS_PASSWORD_HASHING["PROFILE"],
+        PASSWORD_HASHING_PROFILES["pbkdf2"],
+    ),
+    *PASSWORD_HASHING_PROFILES.values(),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -156,13 +194,27 @@ CAPTCHA_FONT_SIZE = 30
 
 # rest framework
 REST_FRAMEWORK = {
+    # dispatches to the Basic, Token, JWT or session authentication by the
+    # scheme of the Authorization header
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ]
+        "accounts.api.authentication.SchemeAuthentication",
+    ],
+    # JSON through orjson, or the json module when it is not installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+# MessagePack for clients sending Accept: application/msgpack
+if find_spec("msgpack"):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].append(
+        "core.renderers.MessagePackRenderer"
+    )
 
 
 CORS_ALLOW_CREDENTIALS = True
@@ -177,10 +229,59 @@ EMAIL_USE_TLS = False
 EMAIL_USE_SSL = False
 DEFAULT_FROM_EMAIL = "from@example.com"
 
+# email dispatch: "thread" sends from a bounded pool of worker threads in
+# each process, "celery" hands rendered messages to the celery workers
+EMAIL_DISPATCH_BACKEND = config("EMAIL_DISPATCH_BACKEND", default="thread")
+EMAIL_QUEUE = {
+    "WORKERS": 2,
+    "MAXSIZE": 1000,
+    "BATCH_SIZE": 20,
+    "RETRIES": 3,
+    "BACKOFF": 1.0,
+    "PUT_TIMEOUT": 1.0,
+}
+
+# weather api: upstream connections are pooled and kept alive, timeouts are
+# in seconds and MAX_CONNECTIONS also bounds concurrent upstream calls.
+# Found cities are cached for TIMEOUT seconds and then served stale for up
+# to STALE_TIMEOUT more while refreshed, unknown ones for NOT_FOUND_TIMEOUT.
+# The circuit breaker opens when BREAKER_FAILURE_RATE of at least
+# BREAKER_MIN_CALLS calls in BREAKER_WINDOW seconds failed, and probes again
+# after BREAKER_RESET_TIMEOUT; meanwhile the last good data of a city, kept
+# for LAST_GOOD_TIMEOUT, is served with an X-Weather-Stale header
+WEATHER_API = {
+    "URL": "http://api.openweathermap.org/data/2.5/weather",
+    "KEY": config(
+        "WEATHER_API_KEY", default="1e7173b8a2b50e85add91dfd559f83da"
+    ),
+    "CONNECT_TIMEOUT": 2.0,
+    "READ_TIMEOUT": 5.0,
+    "MAX_CONNECTIONS": 20,
+    "MAX_KEEPALIVE_CONNECTIONS": 10,
+    "TIMEOUT": 60 * 20,
+    "STALE_TIMEOUT": 60 * 60,
+    "NOT_FOUND_TIMEOUT": 60 * 5,
+    "LAST_GOOD_TIMEOUT": 60 * 60 * 24,
+    "LOCK_TIMEOUT": 10,
+    "BREAKER_WINDOW": 30,
+    "BREAKER_MIN_CALLS": 10,
+    "BREAKER_FAILURE_RATE": 0.5,
+    "BREAKER_RESET_TIMEOUT": 30,
+}
+
 
 # celery config
 # CELERY_BROKER_URL = 'redis://redis:6379/1'
 CELERY_BROKER_URL = 'redis://redis:6379/1'
+# the parallel purge chord collects its partitions' results here
+CELERY_RESULT_BACKEND = 'redis://redis:6379/3'
+CELERY_BEAT_SCHEDULE = {
+    # deleted task tombstones are only kept for TODO_TOMBSTONE_RETENTION_DAYS
+    "prune-task-tombstones": {
+        "task": "todo.tasks.prune_task_tombstones",
+        "schedule": crontab(hour=3, minute=0),
+    },
+}
 
 # CELERY_TIMEZONE = "Australia/Tasmania"
 # CELERY_TASK_TRACK_STARTED = True
@@ -201,3 +302,37 @@ CACHES = {
 # Optional: This is to ensure Django sessions are stored in Redis
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
+
+
+# accounts app
+# seconds an authenticated user stays in the cache
+ACCOUNTS_USER_CACHE_TIMEOUT = 60
+# build the JWT user from the token claims instead of loading it
+ACCOUNTS_JWT_TOKEN_USER = False
+# seconds verified Basic credentials skip the password hasher
+ACCOUNTS_BASIC_AUTH_CACHE_TIMEOUT = 60
+
+
+# todo app
+# seconds a rendered task list page stays in the cache
+TODO_TASK_LIST_CACHE_TIMEOUT = 60 * 5
+# tasks per page of the html task list
+TODO_WEB_PAGE_SIZE = 50
+# task sync: how long deletions are remembered and how far the returned
+# watermark lags behind the clock to cover in-flight transactions
+TODO_TOMBSTONE_RETENTION_DAYS = 30
+TODO_SYNC_MARGIN_SECONDS = 5
+# maximum number of creates, updates and deletes in one bulk request
+TODO_BULK_MAX_ITEMS = 1000
+# rows fetched and streamed at a time by the task export
+TODO_EXPORT_CHUNK_SIZE = 2000
+# task import: rows validated and inserted per batch, line errors listed
+# in a summary and seconds the progress of a background import is kept
+TODO_IMPORT_BATCH_SIZE = 1000
+TODO_IMPORT_MAX_ERRORS = 100
+TODO_IMPORT_JOB_TIMEOUT = 60 * 60 * 24
+# completed task purge: rows deleted per chunk and pause between chunks
+TODO_PURGE_BATCH_SIZE = 1000
+TODO_PURGE_PAUSE_SECONDS = 0.05
+# number of user id ranges, and so of workers, used by the parallel purge
+TODO_PURGE_CONCURRENCY = 4
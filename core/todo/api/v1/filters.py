@@ -1,4 +1,7 @@
+from rest_framework.filters import OrderingFilter, SearchFilter
+
 from todo.models import Task
+from todo.search import RANK_FIELD, search_tasks
 import django_filters
 
 
@@ -47,3 +50,37 @@ class TaskFilter(django_filters.FilterSet):
                 "gte",
             ],  # Filter tasks based on their creation date
         }
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    A search filter matching task titles through the database's full-text
+    index instead of `title LIKE '%term%'`.
+
+    Every search term matches the words of a title it is a prefix of, all
+    terms have to match, and the results are annotated with their rank.
+    On databases without a full-text index it falls back to SearchFilter
+    over the view's `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        results = search_tasks(queryset, terms)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    An ordering filter that orders search results by rank, unless the
+    client asked for an ordering of its own.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        requested = request.query_params.get(self.ordering_param)
+        if not requested and RANK_FIELD in queryset.query.annotations:
+            return [RANK_FIELD, "id"]
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,275 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    LimitOffsetPagination,
+)
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TaskOffsetPagination(LimitOffsetPagination):
+    """
+    Offset based pagination for clients that need to jump to an arbitrary
+    position in the task list.
+
+    It is only used when the request carries a `limit` or `offset` query
+    parameter, see `TaskCursorPagination`.
+    """
+
+    default_limit = 50
+    max_limit = 500
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination for the task list.
+
+    Unlike the stock `CursorPagination`, which positions on the first
+    ordering field only and falls back to an offset for duplicates, this
+    class uses every ordering field as a composite key, so every page is a
+    single indexed range query no matter how deep the client pages.
+
+    The cursor is an opaque url-safe token holding the ordering and the
+    values of the last row on the page. A request with `limit` or `offset`
+    is handed to `offset_pagination_class` instead.
+
+    Attributes:
+    page_size: The default number of tasks per page.
+    page_size_query_param: The query parameter used to request a page size.
+    max_page_size: The upper bound for a client requested page size.
+    ordering: The default ordering, matching `TaskViewSet.ordering`.
+    unique_field: The field appended to the ordering to make it unique.
+    offset_pagination_class: The pagination used for offset requests.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-is_done", "id")
+    unique_field = "id"
+    offset_pagination_class = TaskOffsetPagination
+
+    def __init__(self):
+        self.offset_paginator = None
+
+    def use_offset(self, request):
+        """
+        Return True if the client asked for offset based pagination.
+        """
+        params = request.query_params
+        offset_paginator = self.offset_pagination_class
+        return (
+            offset_paginator.limit_query_param in params
+            or offset_paginator.offset_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_offset(request):
+            self.offset_paginator = self.offset_pagination_class()
+            return self.offset_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is not None:
+            self.cursor = self.cursor._replace(
+                position=self.clean_position(queryset, self.cursor.position)
+            )
+        self.next_position = self.previous_position = None
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(_reverse_field(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                _keyset_filter(ordering, self.cursor.position)
+            )
+
+        # Fetch one extra row to find out whether another page follows.
+        results = list(queryset[: self.page_size + 1])
+        has_following = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+
+        if self.page:
+            self.next_position = self._get_position_from_instance(
+                self.page[-1], self.ordering
+            )
+            self.previous_position = self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering requested for the view, extended with the
+        unique field so that every row has a distinct position.
+        """
+        ordering = super().get_ordering(request, queryset, view)
+        names = {field.lstrip("-") for field in ordering}
+        if self.unique_field not in names and "pk" not in names:
+            ordering += (self.unique_field,)
+        return ordering
+
+    def clean_position(self, queryset, position):
+        """
+        Convert the values of a decoded cursor position to the types of
+        their ordering fields, raising NotFound for a value that does not
+        fit, e.g. from a forged cursor.
+        """
+        opts = queryset.model._meta
+        annotations = queryset.query.annotations
+        cleaned = []
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            if name in annotations:
+                model_field = annotations[name].output_field
+            elif name == "pk":
+                model_field = opts.pk
+            else:
+                model_field = opts.get_field(name)
+            try:
+                value = model_field.to_python(value)
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            cleaned.append(value)
+        return tuple(cleaned)
+
+    def get_next_link(self):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_next_link()
+        if not self.has_next:
+            return None
+        if self.next_position is None:
+            # An empty reversed page means we walked past the start.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        cursor = Cursor(offset=0, reverse=False, position=self.next_position)
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_previous_link()
+        if not self.has_previous or self.previous_position is None:
+            return None
+        cursor = Cursor(
+            offset=0, reverse=True, position=self.previous_position
+        )
+        return self.encode_cursor(cursor)
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.offset_paginator is not None:
+            return self.offset_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        offset_paginator = self.offset_pagination_class()
+        return parameters + offset_paginator.get_schema_operation_parameters(
+            view
+        )
+
+    def decode_cursor(self, request):
+        """
+        Given a request with a cursor, return a `Cursor` instance whose
+        position is a tuple with one value per ordering field.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            tokens = json.loads(urlsafe_b64decode(encoded + padding))
+            ordering = tuple(tokens["o"])
+            position = tuple(tokens["p"])
+            reverse = bool(tokens.get("r", False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # A cursor is only meaningful for the ordering it was issued for.
+        if ordering != self.ordering or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        """
+        Given a Cursor instance, return an url with encoded cursor.
+        """
+        tokens = {"o": self.ordering, "p": cursor.position}
+        if cursor.reverse:
+            tokens["r"] = 1
+        payload = json.dumps(tokens, separators=(",", ":")).encode()
+        encoded = urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for field in ordering:
+            name = field.lstrip("-")
+            if isinstance(instance, dict):
+                position.append(instance[name])
+            else:
+                position.append(getattr(instance, name))
+        return tuple(position)
+
+
+def _reverse_field(field):
+    if field.startswith("-"):
+        return field[1:]
+    return "-" + field
+
+
+def _keyset_filter(ordering, position):
+    """
+    Build the filter selecting rows that come strictly after `position`
+    for the given ordering, e.g. for ("-is_done", "id"):
+    is_done < d OR (is_done = d AND id > i).
+    """
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= Q(**equal, **{"%s__%s" % (name, lookup): value})
+        equal[name] = value
+    return condition
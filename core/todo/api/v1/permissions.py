@@ -7,7 +7,8 @@ class DefaultPermission(BasePermission):
 
     This class provides object-level permissions for the ToDo objects.
     It allows read access to all requests, but only allows write access to the objects
-    owned by the authenticated user.
+    owned by the authenticated user. Which objects can be read at all is decided by
+    the view's queryset.
     """
 
     def has_object_permission(self, request, view, obj):
@@ -26,4 +27,5 @@ class DefaultPermission(BasePermission):
         if request.method in SAFE_METHODS:
             return True
 
-        return obj.user == request.user
+        # Compare ids so that checking does not load the task's user.
+        return obj.user_id == request.user.id
@@ -1,6 +1,14 @@
+from collections.abc import Mapping
+
 from rest_framework import serializers
+from todo.cache import bump_task_version
 from todo.models import Task
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 
 User = get_user_model()
 
@@ -43,9 +51,9 @@ class TaskSerializer(serializers.ModelSerializer):
         Returns:
         Task: The newly created Task instance.
         """
-        validated_data["user"] = User.objects.get(
-            id=self.context["request"].user.id
-        )
+        # Only the id is needed, request.user may be a token user that
+        # the foreign key does not accept.
+        validated_data["user_id"] = self.context["request"].user.id
         return super().create(validated_data)
 
     def to_representation(self, instance):
@@ -84,3 +92,227 @@ class TaskSerializer(serializers.ModelSerializer):
         """
         request = self.context.get("request")
         return request.build_absolute_uri(obj.get_absolute_url())
+
+
+class TaskListSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer for task list responses.
+
+    It renders exactly what TaskSerializer renders for a list, but works on
+    `.values()` rows instead of model instances, and builds the 'url' field
+    from a prefix computed once per request instead of calling reverse()
+    and build_absolute_uri() for every row.
+
+    Use it with `many=True` on a queryset of `Task.objects.values(*value_fields)`.
+    """
+
+    value_fields = (
+        "id",
+        "user_id",
+        "title",
+        "is_done",
+        "created_date",
+        "updated_date",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # DateTimeField looks the current timezone up on every call unless
+        # it is given one, resolve it once per serializer instead.
+        self.datetime_field = serializers.DateTimeField(
+            default_timezone=(
+                timezone.get_current_timezone() if settings.USE_TZ else None
+            )
+        )
+
+    @cached_property
+    def url_template(self):
+        """
+        Return the (prefix, suffix) around the pk in a task's absolute URL.
+        """
+        request = self.context.get("request")
+        url = request.build_absolute_uri(
+            reverse("todo:api-v1:task-detail", kwargs={"pk": 0})
+        )
+        prefix, _, suffix = url.rpartition("0")
+        return prefix, suffix
+
+    def to_representation(self, row):
+        """
+        Build the representation of a single `.values()` row.
+
+        Parameters:
+        row (dict): A row holding the keys listed in value_fields.
+
+        Returns:
+        dict: The same mapping TaskSerializer returns for a list item.
+        """
+        prefix, suffix = self.url_template
+        to_datetime = self.datetime_field.to_representation
+        return {
+            "id": row["id"],
+            "url": f"{prefix}{row['id']}{suffix}",
+            "user": row["user_id"],
+            "title": row["title"],
+            "is_done": row["is_done"],
+            "created_date": to_datetime(row["created_date"]),
+            "updated_date": to_datetime(row["updated_date"]),
+        }
+
+
+class TaskBulkUpdateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for one item of a bulk update: the id of the task plus the
+    fields to change.
+    """
+
+    id = serializers.IntegerField()
+
+    class Meta:
+        model = Task
+        fields = ["id", "title", "is_done"]
+        extra_kwargs = {
+            "title": {"required": False},
+            "is_done": {"required": False},
+        }
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """
+    Serializer for batches of task creates, partial updates and deletes.
+
+    The whole batch is validated first, errors are reported per item at the
+    item's index, and a valid batch is applied in one transaction with one
+    INSERT, one UPDATE and one DELETE statement. Databases that can not
+    return the inserted rows (SQLite before 3.35) get one INSERT per task.
+    """
+
+    create = TaskSerializer(many=True, required=False)
+    update = TaskBulkUpdateSerializer(many=True, required=False)
+    delete = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+
+    def to_internal_value(self, data):
+        """
+        Reject a batch with too many items before any item is validated.
+
+        Raises:
+            serializers.ValidationError: If the batch is too large.
+        """
+        max_items = getattr(settings, "TODO_BULK_MAX_ITEMS", 1000)
+        if isinstance(data, Mapping):
+            size = sum(
+                len(data[name])
+                for name in ("create", "update", "delete")
+                if isinstance(data.get(name), list)
+            )
+            if size > max_items:
+                message = f"A batch may contain at most {max_items} items."
+                raise serializers.ValidationError({"detail": [message]})
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        """
+        Validate that every task to update or delete exists, belongs to the
+        requesting user and is named only once.
+
+        Args:
+            attrs (dict): A dictionary containing the provided data.
+
+        Raises:
+            serializers.ValidationError: If an item refers to a missing task.
+
+        Returns:
+            dict: A dictionary containing the validated data.
+        """
+        update_ids = [item["id"] for item in attrs.get("update", [])]
+        delete_ids = attrs.get("delete", [])
+
+        owned = set(
+            Task.objects.filter(
+                user_id=self.context["request"].user.id,
+                id__in=update_ids + delete_ids,
+            ).values_list("id", flat=True)
+        )
+        seen = set()
+        update_errors, delete_errors = [], {}
+        for task_id in update_ids:
+            update_errors.append(self.check_id(task_id, owned, seen))
+        for index, task_id in enumerate(delete_ids):
+            error = self.check_id(task_id, owned, seen)
+            if error:
+                delete_errors[index] = error["id"]
+
+        errors = {}
+        if any(update_errors):
+            errors["update"] = update_errors
+        if delete_errors:
+            errors["delete"] = delete_errors
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def check_id(self, task_id, owned, seen):
+        if task_id not in owned:
+            return {"id": ["Not found."]}
+        if task_id in seen:
+            return {"id": ["Duplicate id in batch."]}
+        seen.add(task_id)
+        return {}
+
+    def save(self):
+        """
+        Apply the validated batch in a single transaction.
+
+        Returns:
+            dict: The created tasks and the ids of updated and deleted tasks.
+        """
+        user = self.context["request"].user
+        updates = {
+            item["id"]: {k: v for k, v in item.items() if k != "id"}
+            for item in self.validated_data.get("update", [])
+        }
+        delete_ids = self.validated_data.get("delete", [])
+        now = timezone.now()
+        features = connections[Task.objects.db].features
+
+        with transaction.atomic():
+            created = [
+                Task(user_id=user.id, **item)
+                for item in self.validated_data.get("create", [])
+            ]
+            if features.can_return_rows_from_bulk_insert:
+                Task.objects.bulk_create(created)
+            else:
+                # Without RETURNING bulk_create leaves the pks unset, and
+                # the response needs them.
+                for task in created:
+                    task.save(force_insert=True)
+
+            tasks = list(
+                Task.objects.select_for_update().filter(
+                    user_id=user.id, id__in=updates
+                )
+            )
+            fields = {"updated_date"}
+            for task in tasks:
+                for field, value in updates[task.id].items():
+                    setattr(task, field, value)
+                    fields.add(field)
+                task.updated_date = now
+            if tasks:
+                Task.objects.bulk_update(tasks, sorted(fields))
+
+            deleted = Task.objects.filter(
+                user_id=user.id, id__in=delete_ids
+            ).bulk_delete()
+            if created or tasks:
+                bump_task_version(user.id)
+
+        self.instance = created
+        return {
+            "created": created,
+            "updated": sorted(updates),
+            "deleted": deleted,
+        }
@@ -1,6 +1,11 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet, WeatherAPIView
+from .views import (
+    TaskViewSet,
+    WeatherAPIView,
+    AsyncWeatherView,
+    WeatherStatusAPIView,
+)
 """
 This module contains the URL configuration for the API v1 of the ToDo application.
 
@@ -26,5 +31,7 @@ router.register("task", TaskViewSet, basename="task")
 urlpatterns = router.urls
 urlpatterns += [
     path('api/weather/<str:city_name>/', WeatherAPIView.as_view(), name='weather'),
+    path('api/weather-async/<str:city_name>/', AsyncWeatherView.as_view(), name='weather-async'),
+    path('api/weather-status/', WeatherStatusAPIView.as_view(), name='weather-status'),
 
 ]
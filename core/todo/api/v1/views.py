@@ -1,18 +1,57 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework import status
 import redis
-import requests
 import json
 
-from todo.models import Task
-from .serializers import TaskSerializer
+from hashlib import md5
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+
+from todo.cache import task_list_cache_key, get_task_list_cache_timeout
+from todo.exporter import (
+    EXPORT_CONTENT_TYPES,
+    get_export_chunk_size,
+    stream_export,
+)
+from todo.importer import (
+    IMPORT_FORMATS,
+    create_import_job,
+    get_import_job,
+    guess_import_format,
+    import_tasks,
+)
+from todo.models import Task, TaskTombstone
+from todo.tasks import import_tasks_file
+from todo.weather import aget_weather, get_weather, weather_breaker
+from todo.sync import (
+    WatermarkExpired,
+    decode_watermark,
+    encode_watermark,
+    get_changes,
+    next_watermark,
+)
+from .serializers import (
+    TaskSerializer,
+    TaskListSerializer,
+    TaskBulkSerializer,
+)
 from .permissions import DefaultPermission
-from .filters import TaskFilter
+from .filters import TaskFilter, TaskOrderingFilter, TaskSearchFilter
+from .paginations import TaskCursorPagination
 
 
 
@@ -22,25 +61,353 @@ class TaskViewSet(viewsets.ModelViewSet):
     which provides CRUD operations by default.
 
     Attributes:
-    queryset: The queryset of Task objects to be used for this ViewSet.
+    queryset: The base queryset of Task objects, narrowed to the requesting user in get_queryset.
     serializer_class: The serializer class to be used for serializing and deserializing Task objects.
+    list_serializer_class: The read-only serializer used to render list responses from `.values()` rows.
     permission_classes: The list of permission classes to be applied to this ViewSet.
     filter_backends: The list of filter backends to be used for filtering tasks.
     filterset_class: The filterset class to be used for filtering tasks.
-    search_fields: The list of fields to be searched when performing a search operation.
+    search_fields: The fields searched with LIKE when the database has no full-text index for titles.
     ordering_fields: The list of fields to be used for ordering tasks.
     ordering: The default ordering of tasks.
+    pagination_class: The keyset pagination used for the task list.
+    admin_scope_query_param: The query parameter staff users set to "all" to see every user's tasks.
+    export_query_param: The query parameter selecting the format of an export, "ndjson" or "csv".
+    import_query_param: The query parameter selecting the format of an import, "ndjson" or "csv".
     """
 
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    list_serializer_class = TaskListSerializer
     permission_classes = [DefaultPermission,IsAuthenticated]
 
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend, TaskSearchFilter, TaskOrderingFilter
+    ]
     filterset_class = TaskFilter
     search_fields = ["title"]
     ordering_fields = ["is_done"]
-    ordering = ["-is_done"]
+    ordering = ["-is_done", "id"]
+    pagination_class = TaskCursorPagination
+    admin_scope_query_param = "scope"
+    export_query_param = "output"
+    import_query_param = "input"
+
+    def get_queryset(self):
+        """
+        Return the tasks of the requesting user, or every task when a staff
+        user explicitly asks for the admin-wide scope.
+        """
+        if getattr(self, "swagger_fake_view", False):
+            return Task.objects.none()
+        queryset = super().get_queryset()
+        if self.is_admin_scope():
+            return queryset
+        return queryset.filter(user_id=self.request.user.id)
+
+    def is_admin_scope(self):
+        """
+        Return True if a staff user requested the admin-wide scope.
+        """
+        scope = self.request.query_params.get(self.admin_scope_query_param)
+        return scope == "all" and self.request.user.is_staff
+
+    def get_tombstones(self):
+        """
+        Return the tombstones of the tasks deleted in the current scope.
+        """
+        tombstones = TaskTombstone.objects.all()
+        if self.is_admin_scope():
+            return tombstones
+        return tombstones.filter(user_id=self.request.user.id)
+
+    def list(self, request, *args, **kwargs):
+        """
+        List tasks, answering with 304 Not Modified when the client's
+        validators still match, before anything is serialized.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        stats = queryset.order_by().aggregate(
+            count=Count("id"), last_modified=Max("updated_date")
+        )
+        etag = self.get_etag(stats["count"], stats["last_modified"])
+
+        # A deletion leaves max(updated_date) untouched, so the latest
+        # tombstone has to move Last-Modified forward as well.
+        last_deleted = self.get_tombstones().aggregate(
+            last_deleted=Max("deleted_date")
+        )["last_deleted"]
+        last_modified = max(
+            filter(None, [stats["last_modified"], last_deleted]), default=None
+        )
+        return self.conditional_response(
+            etag, last_modified, lambda: self.cached_list(queryset)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self.get_etag(instance.pk, instance.updated_date)
+        return self.conditional_response(
+            etag,
+            instance.updated_date,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """
+        Return the ids of the tasks created, updated and deleted since the
+        watermark passed as `since`, along with the watermark to send next.
+        Without `since` every task is reported as created.
+        """
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = decode_watermark(since)
+            except signing.BadSignature:
+                return Response(
+                    {"detail": "Invalid watermark."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            except WatermarkExpired:
+                return Response(
+                    {"detail": "Watermark expired, a full sync is required."},
+                    status=status.HTTP_410_GONE,
+                )
+
+        watermark = next_watermark()
+        data = get_changes(self.get_queryset(), self.get_tombstones(), since)
+        data["watermark"] = encode_watermark(watermark)
+        return Response(data)
+
+    @action(
+        detail=False, methods=["post"], serializer_class=TaskBulkSerializer
+    )
+    def bulk(self, request):
+        """
+        Create, partially update and delete many tasks in one request.
+
+        The body holds optional "create" (task objects), "update" (objects
+        with an "id" and the fields to change) and "delete" (task ids)
+        lists. Nothing is written unless every item is valid; errors are
+        reported at the index of the offending item.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        result["created"] = TaskSerializer(
+            result["created"], many=True, context=self.get_serializer_context()
+        ).data
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"])
+    def toggle(self, request, pk=None):
+        """
+        Flip is_done of one of the requesting user's tasks with a single
+        UPDATE and return its new state.
+        """
+        try:
+            pk = int(pk)
+        except ValueError:
+            raise NotFound()
+        is_done = Task.objects.toggle(pk, request.user.id)
+        if is_done is None:
+            raise NotFound()
+        return Response({"id": pk, "is_done": is_done})
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream the tasks matching the list filters as NDJSON or CSV, chosen
+        with the `output` query parameter. Rows are read from the database
+        with an iterator, chunk by chunk, so memory use does not grow with
+        the number of tasks.
+        """
+        output = request.query_params.get(self.export_query_param, "ndjson")
+        if output not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {
+                    "detail": "Unsupported output, expected one of: %s."
+                    % ", ".join(EXPORT_CONTENT_TYPES)
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        chunk_size = get_export_chunk_size()
+        rows = queryset.values(
+            *self.list_serializer_class.value_fields
+        ).iterator(chunk_size=chunk_size)
+        serializer = self.list_serializer_class(
+            context=self.get_serializer_context()
+        )
+        response = StreamingHttpResponse(
+            stream_export(
+                map(serializer.to_representation, rows),
+                output,
+                TaskSerializer.Meta.fields,
+                chunk_size,
+            ),
+            content_type=EXPORT_CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = (
+            'attachment; filename="tasks.%s"' % output
+        )
+        return response
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_file(self, request):
+        """
+        Create tasks from an uploaded NDJSON or CSV `file`, read and
+        inserted in batches, and return a summary with the errors of the
+        rejected lines.
+
+        The format is taken from the `input` query parameter or guessed
+        from the file name. With `background=1` the file is imported by a
+        Celery job instead, whose progress is polled from the returned url.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"file": ["No file was submitted."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        input_format = request.query_params.get(
+            self.import_query_param
+        ) or guess_import_format(upload.name)
+        if input_format not in IMPORT_FORMATS:
+            return Response(
+                {
+                    "detail": "Unsupported input, expected one of: %s."
+                    % ", ".join(IMPORT_FORMATS)
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.query_params.get("background") not in ("1", "true"):
+            summary = import_tasks(request.user.id, upload, input_format)
+            return Response(summary)
+
+        job_id = create_import_job(request.user.id)
+        # The worker may run on another host, the upload is handed over
+        # through the storage.
+        name = default_storage.save("imports/%s" % job_id, upload)
+        import_tasks_file.delay(job_id, request.user.id, name, input_format)
+        url = reverse(
+            "todo:api-v1:task-import-status",
+            kwargs={"job_id": job_id},
+            request=request,
+        )
+        return Response(
+            {"id": job_id, "status": "pending", "url": url},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"import/(?P<job_id>[0-9a-f]{32})",
+        url_name="import-status",
+    )
+    def import_status(self, request, job_id=None):
+        """
+        Return the progress of one of the requesting user's background
+        imports.
+        """
+        job = get_import_job(job_id)
+        if job is None or job["user"] != request.user.id:
+            raise NotFound()
+        return Response(
+            {field: value for field, value in job.items() if field != "user"}
+        )
+
+    def get_etag(self, *state):
+        """
+        Return a strong ETag for the current representation.
+
+        The ETag is derived from a cheap summary of the underlying rows plus
+        everything else the response body depends on: the full URI (filters,
+        pagination, host of the task URLs) and the negotiated media type.
+        """
+        request = self.request
+        key = (request.build_absolute_uri(), request.accepted_media_type)
+        digest = md5(repr(key + state).encode()).hexdigest()
+        return '"%s"' % digest
+
+    def conditional_response(self, etag, last_modified, get_response):
+        """
+        Evaluate the request's conditional headers against the validators
+        and only call get_response when the client needs a full body.
+        """
+        timestamp = None
+        if last_modified is not None:
+            timestamp = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = get_response()
+        if response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def cached_list(self, queryset):
+        """
+        List tasks, serving repeated reads of an unchanged task list from
+        the cache. Entries are keyed on the user's task version, which is
+        bumped on every write, so a cached list is never stale.
+        """
+        if self.is_admin_scope():
+            return self.list_tasks(queryset)
+
+        cache_key = task_list_cache_key(self.request.user.id, self.request)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        response = self.list_tasks(queryset)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                cache_key, response.data, get_task_list_cache_timeout()
+            )
+        return response
+
+    def list_tasks(self, queryset):
+        """
+        List tasks from `.values()` rows through the list serializer, which
+        skips model instantiation and per-row URL resolution.
+        """
+        # Annotations such as the search rank may be part of the ordering
+        # the paginator builds its cursors from.
+        rows = queryset.values(
+            *self.list_serializer_class.value_fields,
+            *queryset.query.annotations,
+        )
+        context = self.get_serializer_context()
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = self.list_serializer_class(
+                page, many=True, context=context
+            )
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.list_serializer_class(
+            rows, many=True, context=context
+        )
+        return Response(serializer.data)
 
 
 
@@ -48,22 +415,45 @@ class TaskViewSet(viewsets.ModelViewSet):
 # Redis connection
 # redis_client = redis.StrictRedis(host='redis', port=6379, db=0)
 
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+# Set on weather answers served from the last known good data while the
+# upstream is unavailable.
+WEATHER_STALE_HEADER = "X-Weather-Stale"
+
 
-@method_decorator(cache_page(60 * 20), name='dispatch')  
 class WeatherAPIView(APIView):
     def get(self, request, city_name):
+        # Look the weather up through the weather cache, which coalesces
+        # concurrent misses and refreshes stale entries in the background
+        status_code, data, degraded = get_weather(city_name)
+        response = Response(data, status=status_code)
+        if degraded:
+            response[WEATHER_STALE_HEADER] = "1"
+        return response
+
+
+class AsyncWeatherView(View):
+    """
+    Async variant of WeatherAPIView.
+
+    Served through core.asgi, the upstream call awaits on the event loop's
+    pooled HTTP client instead of pinning a worker for its full latency.
+    """
+
+    async def get(self, request, city_name):
+        status_code, data, degraded = await aget_weather(city_name)
+        response = JsonResponse(data, status=status_code)
+        if degraded:
+            response[WEATHER_STALE_HEADER] = "1"
+        return response
+
+
+class WeatherStatusAPIView(APIView):
+    """
+    Reports the state and counters of this process's weather circuit
+    breaker to staff users.
+    """
+
+    permission_classes = [IsAdminUser]
 
-        # Fetch the weather data from an external API
-        api_key = '1e7173b8a2b50e85add91dfd559f83da'
-        url = f'http://api.openweathermap.org/data/2.5/weather?q={city_name}&appid={api_key}&units=metric'
-        response = requests.get(url)
-
-        if response.status_code == 200:
-            weather_data = response.json()
-            
-            return Response(weather_data, status=status.HTTP_200_OK)
-        
-        return Response({'error': 'City not found'}, status=status.HTTP_404_NOT_FOUND)
-    
+    def get(self, request):
+        return Response(weather_breaker.stats())
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TodoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "todo"
+
+    def ready(self):
+        from .search import restore_fts_triggers
+
+        post_migrate.connect(restore_fts_triggers, sender=self)
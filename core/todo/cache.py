@@ -0,0 +1,70 @@
+from hashlib import md5
+from time import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "todo:tasks:version:{user_id}"
+LIST_KEY = "todo:tasks:list:{user_id}:{version}:{digest}"
+
+
+def _seed_version():
+    # Seeded from the clock, so a version key that was evicted can never
+    # come back with a value that older entries were stored under.
+    return int(time() * 1000000)
+
+
+def get_task_version(user_id):
+    """
+    Return the current version of a user's tasks.
+
+    The version changes whenever one of the user's tasks is written, so it
+    can be part of any cache key derived from the user's tasks.
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_task_version(*user_ids):
+    """
+    Invalidate everything cached for the given users' tasks.
+
+    The bump runs once the current transaction commits, so a concurrent
+    reader can not cache pre-commit rows under the new version.
+    """
+    def bump():
+        for user_id in set(user_ids):
+            key = VERSION_KEY.format(user_id=user_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, _seed_version(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def task_list_cache_key(user_id, request):
+    """
+    Return the cache key of a task list response for the given request.
+
+    The key covers the absolute URI, so every filter, search, ordering and
+    pagination parameter as well as the host used in the task URLs are
+    part of it.
+    """
+    path = request.build_absolute_uri(request.path)
+    params = sorted(request.GET.lists())
+    digest = md5(repr((path, params)).encode()).hexdigest()
+    return LIST_KEY.format(
+        user_id=user_id,
+        version=get_task_version(user_id),
+        digest=digest,
+    )
+
+
+def get_task_list_cache_timeout():
+    return getattr(settings, "TODO_TASK_LIST_CACHE_TIMEOUT", 60 * 5)
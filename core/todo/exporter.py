@@ -0,0 +1,70 @@
+import csv
+import json
+
+from django.conf import settings
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def get_export_chunk_size():
+    """
+    Return the number of rows fetched from the database, and written to
+    the response, at a time.
+    """
+    return getattr(settings, "TODO_EXPORT_CHUNK_SIZE", 2000)
+
+
+class Echo:
+    """
+    A file-like object that hands back what is written to it, so that
+    csv.writer can format a single row without buffering the others.
+    """
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(items):
+    for item in items:
+        yield json.dumps(item, separators=(",", ":")) + "\n"
+
+
+def csv_lines(items, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for item in items:
+        yield writer.writerow([item[field] for field in fields])
+
+
+def stream_export(items, output, fields, chunk_size=None):
+    """
+    Encode task representations one after the other and group the lines
+    into chunks, so a response never holds more than one chunk.
+
+    Parameters:
+    items: An iterable of task representations, e.g. built from
+    `.values().iterator()` rows.
+    output: One of the keys of EXPORT_CONTENT_TYPES.
+    fields: The keys of a representation, in the order of the CSV columns.
+    chunk_size: The number of lines per chunk.
+
+    Returns:
+    A generator of strings.
+    """
+    chunk_size = chunk_size or get_export_chunk_size()
+    if output == "csv":
+        lines = csv_lines(items, fields)
+    else:
+        lines = ndjson_lines(items)
+
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
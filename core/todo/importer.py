@@ -0,0 +1,202 @@
+import codecs
+import csv
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .api.v1.serializers import TaskSerializer
+from .cache import bump_task_version
+from .models import Task
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_JOB_KEY = "todo:import:{job_id}"
+
+INVALID_JSON = {"non_field_errors": ["Invalid JSON."]}
+NOT_AN_OBJECT = {"non_field_errors": ["Expected a JSON object."]}
+INVALID_ENCODING = {"non_field_errors": ["The file is not valid UTF-8."]}
+
+
+def get_import_batch_size():
+    """
+    Return the number of rows validated and inserted at a time.
+    """
+    return getattr(settings, "TODO_IMPORT_BATCH_SIZE", 1000)
+
+
+def get_import_max_errors():
+    """
+    Return the number of line errors reported in an import summary, the
+    remaining ones are only counted.
+    """
+    return getattr(settings, "TODO_IMPORT_MAX_ERRORS", 100)
+
+
+def get_import_job_timeout():
+    return getattr(settings, "TODO_IMPORT_JOB_TIMEOUT", 60 * 60 * 24)
+
+
+def guess_import_format(name):
+    """
+    Return the import format matching a file name, NDJSON unless the name
+    ends with .csv.
+    """
+    return "csv" if name and name.lower().endswith(".csv") else "ndjson"
+
+
+def read_ndjson(lines):
+    """
+    Yield a (line number, item, error) tuple for every non blank line.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield number, None, INVALID_JSON
+            continue
+        if not isinstance(item, dict):
+            yield number, None, NOT_AN_OBJECT
+            continue
+        yield number, item, None
+
+
+def read_csv(lines):
+    """
+    Yield a (line number, item, error) tuple for every record after the
+    header. Empty cells are left out, so that they take their default.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        item = {
+            field: value
+            for field, value in row.items()
+            if field is not None and value not in ("", None)
+        }
+        yield reader.line_num, item, None
+
+
+def import_tasks(
+    user_id, lines, input_format, batch_size=None, progress=None
+):
+    """
+    Create tasks for a user from an NDJSON or CSV file, one batch at a time.
+
+    The file is read line by line and never held in memory. Each batch is
+    validated with the TaskSerializer rules and its valid rows inserted with
+    one bulk_create, invalid rows are reported with their line number.
+
+    Parameters:
+    user_id (int): The owner of the created tasks.
+    lines: An iterable of the file's lines as bytes, e.g. an open file or
+    an UploadedFile.
+    input_format (str): One of IMPORT_FORMATS.
+    batch_size (int): The number of rows per batch.
+    progress (callable): Called with the summary after every batch and
+    once the import is done.
+
+    Returns:
+    dict: The number of lines read, tasks created and rows rejected, and
+    the errors of the first rejected rows.
+    """
+    batch_size = batch_size or get_import_batch_size()
+    read = read_csv if input_format == "csv" else read_ndjson
+    summary = {"lines": 0, "created": 0, "failed": 0, "errors": []}
+
+    batch = []
+    try:
+        items = read(codecs.iterdecode(lines, "utf-8-sig"))
+        for number, item, error in items:
+            summary["lines"] = number
+            if error is not None:
+                add_error(summary, number, error)
+                continue
+            batch.append((number, item))
+            if len(batch) >= batch_size:
+                save_batch(user_id, batch, summary)
+                batch = []
+                if progress is not None:
+                    progress(summary)
+    except UnicodeDecodeError:
+        # Decoding can not resume after a bad byte sequence, the rest of
+        # the file is skipped.
+        add_error(summary, summary["lines"] + 1, INVALID_ENCODING)
+
+    if batch:
+        save_batch(user_id, batch, summary)
+    if progress is not None:
+        progress(summary)
+    return summary
+
+
+def save_batch(user_id, batch, summary):
+    """
+    Validate a batch of (line number, item) pairs and insert its valid rows.
+    """
+    serializer = TaskSerializer(data=[item for _, item in batch], many=True)
+    if serializer.is_valid():
+        valid = serializer.validated_data
+    else:
+        # A failing list keeps no validated data, only the valid rows of
+        # the batch are validated again.
+        valid = []
+        for (number, item), errors in zip(batch, serializer.errors):
+            if errors:
+                add_error(summary, number, errors)
+            else:
+                valid.append(serializer.child.run_validation(item))
+
+    if valid:
+        Task.objects.bulk_create(
+            Task(user_id=user_id, **data) for data in valid
+        )
+        bump_task_version(user_id)
+        summary["created"] += len(valid)
+
+
+def add_error(summary, number, errors):
+    summary["failed"] += 1
+    if len(summary["errors"]) < get_import_max_errors():
+        summary["errors"].append({"line": number, "errors": errors})
+
+
+def create_import_job(user_id):
+    """
+    Register a background import of a user and return its job id.
+    """
+    job_id = uuid4().hex
+    save_import_job(
+        job_id,
+        {
+            "id": job_id,
+            "user": user_id,
+            "status": "pending",
+            "lines": 0,
+            "created": 0,
+            "failed": 0,
+            "errors": [],
+        },
+    )
+    return job_id
+
+
+def get_import_job(job_id):
+    """
+    Return the progress of a background import, or None once it expired.
+    """
+    return cache.get(IMPORT_JOB_KEY.format(job_id=job_id))
+
+
+def save_import_job(job_id, job):
+    cache.set(
+        IMPORT_JOB_KEY.format(job_id=job_id), job, get_import_job_timeout()
+    )
+
+
+def update_import_job(job_id, **changes):
+    job = get_import_job(job_id)
+    if job is not None:
+        job.update(changes)
+        save_import_job(job_id, job)
@@ -0,0 +1,91 @@
+from datetime import timedelta
+from io import BytesIO
+from statistics import median
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core.parsers import ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer, msgpack, orjson
+from todo.api.v1.serializers import TaskListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Measures the time to render and parse task list payloads with each available renderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='The number of tasks in the payload')
+        parser.add_argument('--repeat', type=int, default=5, help='The number of times each renderer is timed')
+
+    def handle(self, *args, **kwargs):
+        rows = kwargs['rows']
+        repeat = kwargs['repeat']
+        if rows < 1 or repeat < 1:
+            raise CommandError('The rows and repeat options must be at least 1')
+
+        data = self.payload(rows)
+        candidates = [('json', JSONRenderer, JSONParser)]
+        if orjson is not None:
+            candidates.append(('orjson', ORJSONRenderer, ORJSONParser))
+        else:
+            self.stdout.write(self.style.WARNING('orjson is not installed'))
+        if msgpack is not None:
+            candidates.append(('msgpack', MessagePackRenderer, None))
+        else:
+            self.stdout.write(self.style.WARNING('msgpack is not installed'))
+
+        for name, renderer_class, parser_class in candidates:
+            renderer = renderer_class()
+            render = self.time(lambda: renderer.render(data), repeat)
+            content = renderer.render(data)
+            line = f'{name:<8} render {render * 1000:8.1f} ms'
+            if parser_class is not None:
+                parser = parser_class()
+                parse = self.time(
+                    lambda: parser.parse(BytesIO(content)), repeat
+                )
+                line += f'  parse {parse * 1000:8.1f} ms'
+            self.stdout.write(self.style.SUCCESS(
+                f'{line}  {len(content)} bytes for {rows} tasks'
+            ))
+
+    def payload(self, rows):
+        """
+        Return a task list response body of `rows` tasks, as rendered by
+        TaskViewSet.list.
+        """
+        url = reverse('todo:api-v1:task-list')
+        # Only the task URLs depend on the host, any valid one will do.
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            request = APIRequestFactory().get(url)
+            now = timezone.now()
+            results = TaskListSerializer(
+                [
+                    {
+                        'id': index,
+                        'user_id': index % 100 + 1,
+                        'title': f'Task number {index}',
+                        'is_done': index % 2 == 0,
+                        'created_date': now - timedelta(minutes=index),
+                        'updated_date': now,
+                    }
+                    for index in range(1, rows + 1)
+                ],
+                many=True,
+                context={'request': request},
+            ).data
+        return {'next': None, 'previous': None, 'results': results}
+
+    def time(self, run, repeat):
+        durations = []
+        for _ in range(repeat):
+            started = monotonic()
+            run()
+            durations.append(monotonic() - started)
+        return median(durations)
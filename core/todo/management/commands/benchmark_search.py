@@ -0,0 +1,103 @@
+from random import Random
+from statistics import median
+from time import monotonic
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from todo.models import Task
+from todo.search import RANK_FIELD, get_search_backend, search_tasks
+
+User = get_user_model()
+
+WORDS = (
+    'report', 'meeting', 'invoice', 'groceries', 'dentist', 'laundry',
+    'deploy', 'review', 'budget', 'garden', 'workout', 'birthday',
+    'renew', 'passport', 'backup', 'refactor', 'newsletter', 'tickets',
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compares searching task titles through the full-text index with the LIKE search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='The number of tasks to search through')
+        parser.add_argument('--users', type=int, default=1000, help='The number of users owning the tasks')
+        parser.add_argument('--term', default='rep', help='The search term')
+        parser.add_argument('--repeat', type=int, default=5, help='The number of times each search is timed')
+        parser.add_argument('--batch-size', type=int, default=10000, help='The number of rows per INSERT')
+        parser.add_argument('--seed', type=int, default=0, help='Seed the generated titles')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['rows'] < 1 or kwargs['users'] < 1 or kwargs['repeat'] < 1:
+            raise CommandError('The rows, users and repeat options must be at least 1')
+        if get_search_backend(connection) is None:
+            raise CommandError(
+                f'No full-text index for task titles on {connection.vendor}'
+            )
+
+        # Everything happens in a transaction that is rolled back, the
+        # generated rows never outlive the benchmark.
+        try:
+            with transaction.atomic():
+                self.benchmark(**kwargs)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def benchmark(self, **kwargs):
+        started = monotonic()
+        user_ids = self.create_rows(**kwargs)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {kwargs["rows"]} tasks in {monotonic() - started:.2f}s'
+        ))
+
+        term = kwargs['term']
+        user_id = user_ids[0]
+        every_task = Task.objects.all()
+        user_tasks = Task.objects.filter(user_id=user_id)
+        searches = [
+            ('LIKE, all users', every_task.filter(title__icontains=term).order_by('id')),
+            ('index, all users', search_tasks(every_task, [term]).order_by(RANK_FIELD, 'id')),
+            ('LIKE, one user', user_tasks.filter(title__icontains=term).order_by('id')),
+            ('index, one user', search_tasks(user_tasks, [term]).order_by(RANK_FIELD, 'id')),
+        ]
+        for name, queryset in searches:
+            count = self.time(queryset.count, kwargs['repeat'])
+            page = self.time(lambda: list(queryset.values('id', 'title')[:50]), kwargs['repeat'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{name:<17} {count[1]:>8} matches  '
+                f'count {count[0] * 1000:8.1f} ms  '
+                f'first page {page[0] * 1000:8.1f} ms'
+            ))
+
+    def create_rows(self, **kwargs):
+        random = Random(kwargs['seed'])
+        emails = [f'search-benchmark-{index}@example.com' for index in range(kwargs['users'])]
+        User.objects.bulk_create(User(email=email, is_verified=True) for email in emails)
+        # bulk_create only sets the pks where the database returns them.
+        user_ids = list(User.objects.filter(email__in=emails).order_by('id').values_list('id', flat=True))
+        rows = kwargs['rows']
+        batch_size = kwargs['batch_size']
+        for start in range(0, rows, batch_size):
+            Task.objects.bulk_create(
+                Task(
+                    user_id=user_ids[index % len(user_ids)],
+                    title=' '.join(random.sample(WORDS, 3)),
+                )
+                for index in range(start, min(start + batch_size, rows))
+            )
+        return user_ids
+
+    def time(self, run, repeat):
+        durations = []
+        for _ in range(repeat):
+            started = monotonic()
+            result = run()
+            durations.append(monotonic() - started)
+        return median(durations), result
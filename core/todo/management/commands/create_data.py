@@ -1,12 +1,40 @@
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from random import choice
+from time import monotonic
+
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from faker import Faker
-from random import choice
+from accounts.models import Profile
 from todo.models import Task
 
 User = get_user_model()
 
+PASSWORD = "a/123456"
+
+
+def generate_tasks(job):
+    """
+    Build the task rows of a chunk of users.
+
+    Runs in the worker processes of the bulk mode, so it must not touch the
+    database. Every chunk has its own seed, which keeps the output the same
+    whatever the number of workers.
+    """
+    seed, user_ids, number_task = job
+    fake = Faker()
+    if seed is not None:
+        fake.seed_instance(seed)
+    return [
+        (user_id, fake.sentence(nb_words=3), fake.pybool())
+        for user_id in user_ids
+        for _ in range(number_task)
+    ]
+
+
 class Command(BaseCommand):
     help = 'Creates test users and tasks'
     fake = Faker()
@@ -14,6 +42,10 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('number_user', type=int, help='The number of users to create')
         parser.add_argument('number_task', type=int, help='The number of tasks per user')
+        parser.add_argument('--bulk', action='store_true', help='Insert rows with bulk_create in batches')
+        parser.add_argument('--batch-size', type=int, default=5000, help='The number of rows per INSERT in bulk mode')
+        parser.add_argument('--workers', type=int, default=1, help='The number of processes generating tasks in bulk mode')
+        parser.add_argument('--seed', type=int, default=None, help='Seed Faker for reproducible data')
 
     def handle(self, *args, **kwargs):
         number_user = kwargs['number_user']
@@ -27,12 +59,20 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'The number of tasks must be greater than 1 (arg2)'))
             sys.exit(1)
 
+        if kwargs['seed'] is not None:
+            self.fake.seed_instance(kwargs['seed'])
+            self.fake.unique.clear()
+
+        if kwargs['bulk']:
+            self.handle_bulk(**kwargs)
+            return
+
         email_user_list = []
 
         for _ in range(number_user):
             user = User.objects.create_user(
                 email=self.fake.free_email(),
-                password="a/123456",  
+                password=PASSWORD,
                 is_verified=True
             )
 
@@ -50,3 +90,89 @@ class Command(BaseCommand):
         for email in email_user_list:
             self.stdout.write(self.style.SUCCESS(f'  {email}'))
 
+    def handle_bulk(self, **kwargs):
+        """
+        Create the users, their profiles and tasks with bulk_create.
+
+        The shared password is hashed once instead of once per user, and
+        the save_profile signal is replaced by a bulk insert of profiles.
+        Task rows are generated in chunks, optionally by a process pool,
+        and inserted batch by batch, each batch in its own transaction.
+        """
+        number_user = kwargs['number_user']
+        number_task = kwargs['number_task']
+        batch_size = kwargs['batch_size']
+        workers = kwargs['workers']
+        seed = kwargs['seed']
+        started = monotonic()
+
+        user_ids = self.bulk_create_users(number_user, batch_size)
+        users_done = monotonic()
+
+        chunk = max(1, batch_size // number_task)
+        jobs = [
+            (
+                None if seed is None else seed + index,
+                user_ids[start:start + chunk],
+                number_task,
+            )
+            for index, start in enumerate(range(0, len(user_ids), chunk))
+        ]
+        created = 0
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for rows in executor.map(generate_tasks, jobs):
+                    created += self.bulk_create_tasks(rows, batch_size)
+        else:
+            for rows in map(generate_tasks, jobs):
+                created += self.bulk_create_tasks(rows, batch_size)
+        finished = monotonic()
+
+        self.report('users', len(user_ids), users_done - started)
+        self.report('tasks', created, finished - users_done)
+        self.stdout.write(self.style.SUCCESS(
+            f'All users share the password {PASSWORD!r}'
+        ))
+
+    def bulk_create_users(self, number_user, batch_size):
+        password = make_password(PASSWORD)
+        user_ids = []
+        while len(user_ids) < number_user:
+            count = min(batch_size, number_user - len(user_ids))
+            emails = {self.fake.unique.free_email() for _ in range(count)}
+            emails -= set(
+                User.objects.filter(email__in=emails)
+                .values_list('email', flat=True)
+            )
+            with transaction.atomic():
+                User.objects.bulk_create(
+                    User(email=email, password=password, is_verified=True)
+                    for email in sorted(emails)
+                )
+                # Read back, bulk_create only sets the pks on databases
+                # that can return the inserted rows.
+                ids = list(
+                    User.objects.filter(email__in=emails)
+                    .order_by('id')
+                    .values_list('id', flat=True)
+                )
+                Profile.objects.bulk_create(
+                    Profile(user_id=user_id) for user_id in ids
+                )
+            user_ids += ids
+        return user_ids
+
+    def bulk_create_tasks(self, rows, batch_size):
+        for start in range(0, len(rows), batch_size):
+            with transaction.atomic():
+                Task.objects.bulk_create(
+                    Task(user_id=user_id, title=title, is_done=is_done)
+                    for user_id, title, is_done in rows[start:start + batch_size]
+                )
+        return len(rows)
+
+    def report(self, name, rows, duration):
+        rate = rows / duration if duration else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {rows} {name} in {duration:.2f}s ({rate:.0f} rows/s)'
+        ))
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from todo.importer import IMPORT_FORMATS, guess_import_format, import_tasks
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Imports tasks for a user from an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='The email of the user owning the tasks')
+        parser.add_argument('path', help='The NDJSON or CSV file to import')
+        parser.add_argument('--input', choices=IMPORT_FORMATS, help='The format of the file, guessed from its name by default')
+        parser.add_argument('--batch-size', type=int, default=None, help='The number of rows validated and inserted at a time')
+
+    def handle(self, *args, **kwargs):
+        try:
+            user = User.objects.get(email=kwargs['email'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user with the email {kwargs["email"]}')
+        input_format = kwargs['input'] or guess_import_format(kwargs['path'])
+
+        try:
+            with open(kwargs['path'], 'rb') as lines:
+                summary = import_tasks(
+                    user.id,
+                    lines,
+                    input_format,
+                    batch_size=kwargs['batch_size'],
+                    progress=self.report,
+                )
+        except OSError as error:
+            raise CommandError(error)
+
+        for error in summary['errors']:
+            messages = '; '.join(
+                f'{field}: {" ".join(map(str, details))}'
+                for field, details in error['errors'].items()
+            )
+            self.stdout.write(self.style.ERROR(
+                f'line {error["line"]}: {messages}'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Read {summary["lines"]} lines, created {summary["created"]} '
+            f'tasks, rejected {summary["failed"]} rows'
+        ))
+
+    def report(self, summary):
+        self.stdout.write(
+            f'{summary["lines"]} lines read, {summary["created"]} tasks created'
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "-is_done", "id"], name="todo_task_user_done_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "created_date"], name="todo_task_user_created_idx"
+            ),
+        ),
+    ]
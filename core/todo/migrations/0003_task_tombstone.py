@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("todo", "0002_task_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                ("deleted_date", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "updated_date"], name="todo_task_user_updated_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tasktombstone",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tasktombstone",
+            index=models.Index(
+                fields=["user", "deleted_date"], name="todo_tombstone_user_date_idx"
+            ),
+        ),
+    ]
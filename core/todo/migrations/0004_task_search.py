@@ -0,0 +1,98 @@
+from django.db import migrations
+
+# An external content FTS5 table: it only stores the index, the titles
+# stay in todo_task. The triggers keep it in sync with every write,
+# including bulk_create, queryset updates and raw deletes.
+#
+# SQLite drops the triggers along with the table whenever a migration has
+# to rebuild todo_task, todo.search.restore_fts_triggers recreates them
+# after every migrate.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE todo_task_fts USING fts5(
+        title,
+        content='todo_task',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER todo_task_fts_insert AFTER INSERT ON todo_task BEGIN
+        INSERT INTO todo_task_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER todo_task_fts_delete AFTER DELETE ON todo_task BEGIN
+        INSERT INTO todo_task_fts (todo_task_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER todo_task_fts_update AFTER UPDATE OF title ON todo_task
+    BEGIN
+        INSERT INTO todo_task_fts (todo_task_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+        INSERT INTO todo_task_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    "INSERT INTO todo_task_fts (todo_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS todo_task_fts_update",
+    "DROP TRIGGER IF EXISTS todo_task_fts_delete",
+    "DROP TRIGGER IF EXISTS todo_task_fts_insert",
+    "DROP TABLE IF EXISTS todo_task_fts",
+]
+
+# The expression must match the one built by todo.search.search_tasks.
+POSTGRESQL_FORWARD = [
+    """
+    CREATE INDEX IF NOT EXISTS todo_task_title_search_idx
+    ON todo_task USING gin (to_tsvector('simple', title))
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS todo_task_title_search_idx",
+]
+
+
+def has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == "ENABLE_FTS5" for row in cursor.fetchall())
+
+
+def run(statements):
+    """
+    Return a RunPython callable executing the statements for the current
+    database vendor. Other databases keep searching titles with LIKE.
+    """
+    def execute(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == "sqlite" and has_fts5(schema_editor):
+            sql = statements["sqlite"]
+        elif vendor == "postgresql":
+            sql = statements["postgresql"]
+        else:
+            return
+        for statement in sql:
+            schema_editor.execute(statement)
+
+    return execute
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0003_task_tombstone"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRESQL_FORWARD}),
+            run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRESQL_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0004_task_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskSearchIndex",
+            fields=[
+                (
+                    "task",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="todo.task",
+                    ),
+                ),
+                ("title", models.TextField()),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "todo_task_fts",
+                "managed": False,
+            },
+        ),
+    ]
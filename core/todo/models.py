@@ -1,6 +1,95 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Case, Value, When
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.urls import reverse
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import bump_task_version
+from .search import FTS_TABLE, Match
+
+
+class TaskQuerySet(models.QuerySet):
+    def bulk_delete(self):
+        """
+        Delete the matching tasks with a single DELETE ... WHERE id IN
+        statement instead of Django's per-object collector, doing the work
+        of the post_delete receivers in bulk: tombstones are written with
+        one INSERT and the cache of every affected user is invalidated.
+
+        Returns:
+            list: The ids of the deleted tasks.
+        """
+        rows = list(self.values_list("id", "user_id"))
+        if not rows:
+            return []
+        ids = [task_id for task_id, _ in rows]
+        TaskTombstone.objects.bulk_create(
+            TaskTombstone(task_id=task_id, user_id=user_id)
+            for task_id, user_id in rows
+        )
+        self.model.objects.filter(id__in=ids)._raw_delete(self.db)
+        bump_task_version(*{user_id for _, user_id in rows})
+        return ids
+
+    def toggle(self, pk, user_id):
+        """
+        Flip is_done of one of a user's tasks in a single conditional
+        UPDATE, so concurrent toggles can not lose each other's writes.
+
+        On databases supporting UPDATE ... RETURNING (SQLite 3.35+ and
+        PostgreSQL) the new state comes back with the same statement;
+        elsewhere it is read back in the UPDATE's transaction. Only is_done
+        and updated_date are written, and no signals are sent, so the user's
+        task version is bumped here.
+
+        Returns:
+            bool: The new is_done, or None if the user has no such task.
+        """
+        connection = connections[self.db]
+        now = timezone.now()
+        # MariaDB only returns columns from INSERT, not from UPDATE.
+        if connection.vendor in ("postgresql", "sqlite") and (
+            connection.features.can_return_columns_from_insert
+        ):
+            quote = connection.ops.quote_name
+            sql = (
+                "UPDATE {table} SET {is_done} = NOT {is_done}, "
+                "{updated_date} = %s WHERE {id} = %s AND {user_id} = %s "
+                "RETURNING {is_done}"
+            ).format(
+                table=quote(self.model._meta.db_table),
+                is_done=quote("is_done"),
+                updated_date=quote("updated_date"),
+                id=quote("id"),
+                user_id=quote("user_id"),
+            )
+            params = [
+                connection.ops.adapt_datetimefield_value(now), pk, user_id
+            ]
+            with transaction.atomic(using=self.db):
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    row = cursor.fetchone()
+                if row is None:
+                    return None
+                bump_task_version(user_id)
+            return bool(row[0])
+
+        queryset = self.filter(pk=pk, user_id=user_id)
+        with transaction.atomic(using=self.db):
+            updated = queryset.update(
+                is_done=Case(
+                    When(is_done=True, then=Value(False)),
+                    default=Value(True),
+                ),
+                updated_date=now,
+            )
+            if not updated:
+                return None
+            bump_task_version(user_id)
+            return queryset.values_list("is_done", flat=True).get()
 
 
 class Task(models.Model):
@@ -10,5 +99,95 @@ class Task(models.Model):
     created_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Per-user list in the API's default (-is_done, id) order, also
+            # serving the per-user is_done filters.
+            models.Index(
+                fields=["user", "-is_done", "id"],
+                name="todo_task_user_done_idx",
+            ),
+            # Per-user created_date range filters of TaskFilter.
+            models.Index(
+                fields=["user", "created_date"],
+                name="todo_task_user_created_idx",
+            ),
+            # Per-user changes since a watermark, see the changes endpoint.
+            models.Index(
+                fields=["user", "updated_date"],
+                name="todo_task_user_updated_idx",
+            ),
+        ]
+
     def get_absolute_url(self):
         return reverse("todo:api-v1:task-detail", kwargs={"pk": self.pk})
+
+
+class TaskTombstone(models.Model):
+    """
+    Record of a deleted task, kept so that clients syncing through the
+    changes endpoint learn about deletions.
+    """
+
+    task_id = models.BigIntegerField()
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    deleted_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "deleted_date"],
+                name="todo_tombstone_user_date_idx",
+            ),
+        ]
+
+
+class TaskSearchIndex(models.Model):
+    """
+    The FTS5 index of task titles on SQLite, created along with its sync
+    triggers by the 0004_task_search migration. Searches join it to the
+    tasks, matching `title__match` and ordering by its bm25 `rank`.
+    """
+
+    task = models.OneToOneField(
+        Task,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_index",
+    )
+    title = models.TextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
+
+TaskSearchIndex._meta.get_field("title").register_lookup(Match)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_cache(sender, instance, **kwargs):
+    """
+    Signal receiver that invalidates the cached task lists of the task's
+    user whenever a task is saved or deleted.
+    """
+
+    bump_task_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance, origin=None, **kwargs):
+    """
+    Signal receiver that records a tombstone for every deleted task, unless
+    the task goes away because its user is deleted.
+    """
+
+    if isinstance(origin, get_user_model()):
+        return
+    TaskTombstone.objects.create(task_id=instance.pk, user_id=instance.user_id)
@@ -0,0 +1,169 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Lookup
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "todo_task_fts"
+TEXT_SEARCH_CONFIG = "simple"
+RANK_FIELD = "search_rank"
+
+# Words as the FTS5 unicode61 tokenizer and the "simple" text search
+# configuration split them: runs of letters and digits.
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# The triggers keeping the FTS5 index in sync with todo_task, as created
+# by the 0004_task_search migration. SQLite drops them along with the
+# table whenever a migration rebuilds todo_task.
+FTS_TRIGGERS = {
+    "todo_task_fts_insert": """
+    CREATE TRIGGER todo_task_fts_insert AFTER INSERT ON todo_task BEGIN
+        INSERT INTO todo_task_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    "todo_task_fts_delete": """
+    CREATE TRIGGER todo_task_fts_delete AFTER DELETE ON todo_task BEGIN
+        INSERT INTO todo_task_fts (todo_task_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+    END
+    """,
+    "todo_task_fts_update": """
+    CREATE TRIGGER todo_task_fts_update AFTER UPDATE OF title ON todo_task
+    BEGIN
+        INSERT INTO todo_task_fts (todo_task_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+        INSERT INTO todo_task_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+}
+
+_fts_tables = {}
+
+
+class Match(Lookup):
+    """
+    `title__match` of TaskSearchIndex: an FTS5 full-text query.
+    """
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return "%s MATCH %s" % (lhs, rhs), lhs_params + rhs_params
+
+
+def get_fts_state(connection):
+    """
+    Return whether the todo_task_fts table exists on a SQLite connection,
+    and the names of the sync triggers that are missing.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE (type = 'table' AND name = %s) OR type = 'trigger'",
+            [FTS_TABLE],
+        )
+        found = {(kind, name) for kind, name in cursor.fetchall()}
+    missing = [
+        name for name in FTS_TRIGGERS if ("trigger", name) not in found
+    ]
+    return ("table", FTS_TABLE) in found, missing
+
+
+def get_search_backend(connection):
+    """
+    Return the full-text index available on the given connection:
+    "fts5" for SQLite with the todo_task_fts table and its triggers,
+    "tsvector" for PostgreSQL, or None when titles can only be searched
+    with LIKE. An index whose triggers are gone is stale and not used.
+    """
+    if connection.vendor == "postgresql":
+        return "tsvector"
+    if connection.vendor != "sqlite":
+        return None
+    if connection.alias not in _fts_tables:
+        exists, missing = get_fts_state(connection)
+        _fts_tables[connection.alias] = exists and not missing
+    return "fts5" if _fts_tables[connection.alias] else None
+
+
+def restore_fts_triggers(sender, using, **kwargs):
+    """
+    post_migrate receiver recreating the FTS5 sync triggers a migration
+    rebuilding todo_task dropped, then rebuilding the index from the
+    titles, which may have changed in the meantime.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    _fts_tables.pop(connection.alias, None)
+    exists, missing = get_fts_state(connection)
+    if not exists or not missing:
+        return
+    with connection.cursor() as cursor:
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name])
+        cursor.execute(
+            "INSERT INTO {table} ({table}) VALUES ('rebuild')".format(
+                table=FTS_TABLE
+            )
+        )
+
+
+def search_tokens(terms):
+    """
+    Split search terms into the words the title index is built from.
+    """
+    return [token for term in terms for token in TOKEN_RE.findall(term)]
+
+
+def search_tasks(queryset, terms):
+    """
+    Narrow a task queryset to the titles containing a word starting with
+    each of the given terms, using the database's full-text index.
+
+    Parameters:
+    queryset: A queryset of Task objects.
+    terms: A list of search terms, e.g. from SearchFilter.get_search_terms.
+
+    Returns:
+    The queryset annotated with `search_rank`, where a lower rank is a
+    better match, or None when the database has no full-text index.
+    """
+    connection = connections[queryset.db]
+    backend = get_search_backend(connection)
+    if backend is None:
+        return None
+
+    tokens = search_tokens(terms)
+    if not tokens:
+        return queryset.none()
+
+    if backend == "fts5":
+        # Joined rather than correlated, so that bm25() is computed once
+        # per matching row from a single scan of the index.
+        match = " ".join('"%s"*' % token for token in tokens)
+        return queryset.filter(search_index__title__match=match).annotate(
+            **{RANK_FIELD: F("search_index__rank")}
+        )
+
+    quote = connection.ops.quote_name
+    task_table = quote(queryset.model._meta.db_table)
+
+    # Both expressions are spelled exactly like the index in the
+    # 0004_task_search migration, so that the planner can use it.
+    vector = "to_tsvector('%s', %s.%s)" % (
+        TEXT_SEARCH_CONFIG, task_table, quote("title")
+    )
+    query = "to_tsquery('%s', %%s)" % TEXT_SEARCH_CONFIG
+    tsquery = " & ".join("%s:*" % token for token in tokens)
+    matching = RawSQL(
+        "%s @@ %s" % (vector, query), [tsquery], output_field=BooleanField()
+    )
+    rank = RawSQL(
+        "-ts_rank(%s, %s)::float8" % (vector, query),
+        [tsquery],
+        output_field=FloatField(),
+    )
+    return queryset.filter(matching).annotate(**{RANK_FIELD: rank})
@@ -1,16 +1,266 @@
+import logging
+from datetime import timedelta
+from time import monotonic, sleep
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from celery import shared_task
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from celery import chord, group, shared_task
+
+from .importer import import_tasks, update_import_job
+from .models import Task, TaskTombstone
+from .sync import get_tombstone_retention
+from .weather import refresh_weather
 
-from .models import Task
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+
+def purge_completed_tasks(
+    batch_size=None, older_than=None, dry_run=False, user_ids=None
+):
+    """
+    Deletes the completed tasks of verified users in primary key chunks.
+
+    Every chunk is selected with one keyset query joined on
+    `user__is_verified` and deleted in its own short transaction, and the
+    purge pauses for TODO_PURGE_PAUSE_SECONDS between chunks so that other
+    writers can take the database lock.
+
+    Args:
+        batch_size (int): The number of tasks deleted per chunk.
+        older_than (timedelta): Only purge tasks not updated for this long.
+        dry_run (bool): Only count the tasks that would be deleted.
+        user_ids (tuple): An optional half-open (start, end) user id range.
+
+    Returns:
+        dict: The number of deleted tasks, chunks, the duration in seconds
+        and the rows deleted per second.
+    """
+    batch_size = batch_size or getattr(settings, "TODO_PURGE_BATCH_SIZE", 1000)
+    pause = getattr(settings, "TODO_PURGE_PAUSE_SECONDS", 0)
+
+    queryset = Task.objects.filter(is_done=True, user__is_verified=True)
+    if older_than is not None:
+        queryset = queryset.filter(updated_date__lt=timezone.now() - older_than)
+    if user_ids is not None:
+        queryset = queryset.filter(
+            user_id__gte=user_ids[0], user_id__lt=user_ids[1]
+        )
+
+    started = monotonic()
+    deleted = batches = last_id = 0
+    while True:
+        ids = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        batches += 1
+
+        if dry_run:
+            deleted += len(ids)
+            continue
+        with transaction.atomic():
+            # Re-check is_done, a task may have been reopened meanwhile.
+            deleted += len(
+                Task.objects.filter(id__in=ids, is_done=True).bulk_delete()
+            )
+        if pause:
+            sleep(pause)
+
+    duration = monotonic() - started
+    result = {
+        "deleted": deleted,
+        "batches": batches,
+        "duration": duration,
+        "rows_per_second": deleted / duration if duration else 0.0,
+        "dry_run": dry_run,
+    }
+    logger.info(
+        "Purged %(deleted)d completed tasks in %(batches)d batches "
+        "(%(duration).2fs, %(rows_per_second).0f rows/s, dry_run=%(dry_run)s)",
+        result,
+    )
+    return result
+
+
+@shared_task
+def delete_all_tasks(batch_size=None, older_than_days=None, dry_run=False):
+    """
+    Deletes the completed tasks of verified users.
+
+    Args:
+        batch_size (int): The number of tasks deleted per chunk.
+        older_than_days (int): Only purge tasks not updated for this many days.
+        dry_run (bool): Only count the tasks that would be deleted.
+    """
+    return purge_completed_tasks(
+        batch_size=batch_size,
+        older_than=_days(older_than_days),
+        dry_run=dry_run,
+    )
+
+
+def _days(days):
+    return timedelta(days=days) if days is not None else None
+
+
+def partition_user_ids(partitions):
+    """
+    Split the id space of verified users into at most `partitions`
+    contiguous half-open (start, end) ranges of equal width.
+    """
+    bounds = User.objects.filter(is_verified=True).aggregate(
+        low=Min("id"), high=Max("id")
+    )
+    low, high = bounds["low"], bounds["high"]
+    if low is None:
+        return []
+    width = -(-(high - low + 1) // partitions)
+    return [
+        (start, min(start + width, high + 1))
+        for start in range(low, high + 1, width)
+    ]
+
+
+@shared_task
+def purge_partition(
+    start, end, batch_size=None, older_than_days=None, dry_run=False
+):
+    """
+    Deletes the completed tasks of the verified users whose id lies in
+    [start, end).
+    """
+    result = purge_completed_tasks(
+        batch_size=batch_size,
+        older_than=_days(older_than_days),
+        dry_run=dry_run,
+        user_ids=(start, end),
+    )
+    result["user_ids"] = [start, end]
+    return result
+
+
+@shared_task
+def aggregate_purge_results(results):
+    """
+    Combines the results of the purge_partition subtasks of one purge.
+    """
+    summary = {
+        "deleted": sum(result["deleted"] for result in results),
+        "partitions": [
+            {
+                "user_ids": result["user_ids"],
+                "deleted": result["deleted"],
+                "duration": result["duration"],
+            }
+            for result in results
+        ],
+    }
+    logger.info(
+        "Parallel purge deleted %d tasks over %d partitions",
+        summary["deleted"],
+        len(results),
+    )
+    return summary
+
+
+def dispatch_purge(
+    concurrency=None, batch_size=None, older_than_days=None, dry_run=False
+):
+    """
+    Fans the purge out over a chord of purge_partition subtasks, one per
+    user id range, whose results are combined by aggregate_purge_results.
+
+    At most `concurrency` (TODO_PURGE_CONCURRENCY) subtasks are dispatched,
+    which bounds how many workers hit the database at the same time.
+
+    Returns:
+        AsyncResult: The result of the aggregating callback.
+    """
+    concurrency = concurrency or getattr(
+        settings, "TODO_PURGE_CONCURRENCY", 4
+    )
+    header = group(
+        purge_partition.s(start, end, batch_size, older_than_days, dry_run)
+        for start, end in partition_user_ids(concurrency)
+    )
+    if not header.tasks:
+        return aggregate_purge_results.apply(args=([],))
+    return chord(header)(aggregate_purge_results.s())
+
+
+@shared_task
+def delete_all_tasks_parallel(
+    concurrency=None, batch_size=None, older_than_days=None, dry_run=False
+):
+    """
+    Deletes the completed tasks of verified users using several workers.
+
+    Returns:
+        str: The id of the task that will hold the aggregated result.
+    """
+    return dispatch_purge(
+        concurrency=concurrency,
+        batch_size=batch_size,
+        older_than_days=older_than_days,
+        dry_run=dry_run,
+    ).id
+
+
+@shared_task
+def prune_task_tombstones():
+    """
+    Deletes the tombstones older than the sync retention period.
+    """
+    horizon = timezone.now() - get_tombstone_retention()
+    TaskTombstone.objects.filter(deleted_date__lt=horizon).delete()
+
+
 @shared_task
-def delete_all_tasks():
+def refresh_weather_cache(city_name):
     """
-    Deletes all tasks for verified users.
+    Refreshes the stale weather cache entry of a city in the background.
+    """
+    refresh_weather(city_name)
+
+
+@shared_task
+def import_tasks_file(job_id, user_id, name, input_format):
+    """
+    Imports a file of tasks saved to the default storage, recording the
+    progress in the import job after every batch, and deletes the file.
+
+    Args:
+        job_id (str): The id returned by todo.importer.create_import_job.
+        user_id (int): The owner of the created tasks.
+        name (str): The name of the file in the default storage.
+        input_format (str): "ndjson" or "csv".
+
+    Returns:
+        dict: The import summary.
     """
-    verified_users = User.objects.filter(is_verified=True)
-    for user in verified_users:
-        # Directly delete tasks related to the user
-        Task.objects.filter(user=user,is_done=True).delete() 
+    update_import_job(job_id, status="running")
+    try:
+        with default_storage.open(name, "rb") as upload:
+            summary = import_tasks(
+                user_id,
+                upload,
+                input_format,
+                progress=lambda summary: update_import_job(job_id, **summary),
+            )
+    except Exception:
+        update_import_job(job_id, status="failed")
+        raise
+    finally:
+        default_storage.delete(name)
+    update_import_job(job_id, status="done", **summary)
+    return summary
@@ -0,0 +1,147 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..api.v1.serializers import TaskSerializer
+from ..models import Task, TaskTombstone
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    user = User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    return user
+
+
+@pytest.fixture
+def task_list(user_obj):
+    return [
+        Task.objects.create(user=user_obj, title=f"task {i}")
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db()
+class TestTaskBulkAPI:
+    client = APIClient()
+    url = reverse("todo:api-v1:task-bulk")
+
+    def test_create_update_delete(self, user_obj, task_list):
+        self.client.force_login(user_obj)
+        data = {
+            "create": [{"title": "new 1"}, {"title": "new 2", "is_done": True}],
+            "update": [
+                {"id": task_list[0].id, "is_done": True},
+                {"id": task_list[1].id, "title": "renamed"},
+            ],
+            "delete": [task_list[2].id, task_list[3].id],
+        }
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert [t["title"] for t in response.data["created"]] == [
+            "new 1", "new 2"
+        ]
+        assert response.data["updated"] == [task_list[0].id, task_list[1].id]
+        assert response.data["deleted"] == [task_list[2].id, task_list[3].id]
+
+        tasks = {task.id: task for task in Task.objects.all()}
+        assert len(tasks) == 5
+        assert tasks[task_list[0].id].is_done is True
+        assert tasks[task_list[0].id].title == "task 0"
+        assert tasks[task_list[1].id].title == "renamed"
+        assert tasks[task_list[1].id].is_done is False
+        assert TaskTombstone.objects.count() == 2
+
+    def test_mark_all_done_is_a_few_queries(self, user_obj, task_list):
+        self.client.force_login(user_obj)
+        data = {"update": [{"id": t.id, "is_done": True} for t in task_list]}
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        task_queries = [
+            query for query in context.captured_queries
+            if '"todo_task"' in query["sql"]
+        ]
+        assert len(task_queries) <= 4
+        assert not Task.objects.filter(is_done=False).exists()
+
+    def test_errors_are_reported_per_item(self, user_obj, task_list):
+        other = User.objects.create_user(
+            email="other_email@gmail.com", password="test_password@123"
+        )
+        foreign = Task.objects.create(user=other, title="foreign")
+        self.client.force_login(user_obj)
+        data = {
+            "create": [{"title": "ok"}, {"title": ""}],
+            "update": [{"id": task_list[0].id}, {"id": foreign.id}],
+            "delete": [task_list[1].id, task_list[1].id],
+        }
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["create"][0] == {}
+        assert "title" in response.data["create"][1]
+        # Field errors stop validation before ids are checked.
+        data["create"].pop()
+        response = self.client.post(self.url, data, format="json")
+        assert response.data["update"][0] == {}
+        assert response.data["update"][1] == {"id": ["Not found."]}
+        assert response.data["delete"] == {1: ["Duplicate id in batch."]}
+        assert Task.objects.filter(user=user_obj).count() == 5
+
+    def test_create_without_bulk_returning(self, user_obj, monkeypatch):
+        # SQLite before 3.35 can not return the rows of a bulk INSERT.
+        monkeypatch.setattr(
+            type(connection.features),
+            "can_return_rows_from_bulk_insert",
+            False,
+        )
+        self.client.force_login(user_obj)
+        data = {"create": [{"title": "new 1"}, {"title": "new 2"}]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        tasks = Task.objects.filter(user=user_obj).order_by("id")
+        assert [t["id"] for t in response.data["created"]] == [
+            task.id for task in tasks
+        ]
+        assert response.data["created"][0]["url"].endswith(
+            f"/task/{tasks[0].id}/"
+        )
+
+    def test_batch_size_is_limited(self, user_obj, settings):
+        settings.TODO_BULK_MAX_ITEMS = 2
+        self.client.force_login(user_obj)
+        data = {"create": [{"title": f"task {i}"} for i in range(3)]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "detail" in response.data
+        assert not Task.objects.exists()
+
+    def test_batch_size_is_checked_before_the_items(
+        self, user_obj, settings, monkeypatch
+    ):
+        settings.TODO_BULK_MAX_ITEMS = 2
+        self.client.force_login(user_obj)
+        validated = []
+        run_validation = TaskSerializer.run_validation
+        monkeypatch.setattr(
+            TaskSerializer,
+            "run_validation",
+            lambda self, data: validated.append(data)
+            or run_validation(self, data),
+        )
+        data = {"create": [{"title": "task"}], "delete": [1, 2]}
+        response = self.client.post(self.url, data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["detail"] == [
+            "A batch may contain at most 2 items."
+        ]
+        assert validated == []
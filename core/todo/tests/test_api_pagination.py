@@ -0,0 +1,107 @@
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from ..api.v1.paginations import TaskCursorPagination
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    user = User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    return user
+
+
+@pytest.fixture
+def task_list(user_obj):
+    return Task.objects.bulk_create(
+        Task(user=user_obj, title=f"task {i}", is_done=i % 3 == 0)
+        for i in range(25)
+    )
+
+
+def expected_ids():
+    return list(
+        Task.objects.order_by("-is_done", "id").values_list("id", flat=True)
+    )
+
+
+@pytest.mark.django_db()
+class TestTaskPagination:
+    client = APIClient()
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url, format='json')
+            assert response.status_code == status.HTTP_200_OK
+            ids += [task['id'] for task in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_cursor_pages_follow_default_ordering(self, user_obj, task_list):
+        url = reverse('todo:api-v1:task-list') + '?page_size=7'
+        self.client.force_login(user_obj)
+        assert self.walk(url) == expected_ids()
+
+    def test_previous_link_returns_previous_page(self, user_obj, task_list):
+        url = reverse('todo:api-v1:task-list') + '?page_size=5'
+        self.client.force_login(user_obj)
+        first = self.client.get(url).data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        assert back['results'] == first['results']
+
+    def test_cursor_is_stable_across_inserts(self, user_obj, task_list):
+        url = reverse('todo:api-v1:task-list') + '?page_size=10'
+        self.client.force_login(user_obj)
+        before = expected_ids()
+        first = self.client.get(url).data
+        # Lands on the first page, so it must not shift the second one.
+        Task.objects.create(user=user_obj, title="late", is_done=True)
+        second = self.client.get(first['next']).data
+        seen = [t['id'] for t in first['results'] + second['results']]
+        assert seen == before[:20]
+
+    def test_page_size_is_capped(self, user_obj, task_list, monkeypatch):
+        monkeypatch.setattr(TaskCursorPagination, 'max_page_size', 10)
+        url = reverse('todo:api-v1:task-list') + '?page_size=100000'
+        self.client.force_login(user_obj)
+        response = self.client.get(url)
+        assert len(response.data['results']) == 10
+
+    def test_invalid_cursor(self, user_obj, task_list):
+        url = reverse('todo:api-v1:task-list') + '?cursor=bogus'
+        self.client.force_login(user_obj)
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize('position', [
+        ['x', 1], [True, 'abc'], [None, 1], [[1], 1], [True, {}],
+    ])
+    def test_forged_cursor(self, user_obj, task_list, position):
+        payload = json.dumps({'o': ['-is_done', 'id'], 'p': position})
+        cursor = urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        url = reverse('todo:api-v1:task-list') + '?cursor=' + cursor
+        self.client.force_login(user_obj)
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_offset_fallback(self, user_obj, task_list):
+        url = reverse('todo:api-v1:task-list') + '?limit=5&offset=10'
+        self.client.force_login(user_obj)
+        response = self.client.get(url)
+        assert response.data['count'] == 25
+        ids = [task['id'] for task in response.data['results']]
+        assert ids == expected_ids()[10:15]
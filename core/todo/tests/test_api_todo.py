@@ -69,3 +69,61 @@ class TestTaskAPI:
         response = self.client.delete(url, format='json')
         assert response.status_code == status.HTTP_204_NO_CONTENT
         assert Task.objects.filter(id=task_obj.id).count() == 0
+
+
+@pytest.fixture
+def other_task_obj():
+    other_user = User.objects.create_user(
+        email="other_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    return Task.objects.create(user=other_user, title="other_title")
+
+
+@pytest.mark.django_db()
+class TestTaskAPIScope:
+    client = APIClient()
+
+    def test_list_only_contains_own_tasks(
+        self, user_obj, task_obj, other_task_obj
+    ):
+        url = reverse('todo:api-v1:task-list')
+        self.client.force_login(user_obj)
+        response = self.client.get(url, format='json')
+        ids = [task['id'] for task in response.data['results']]
+        assert ids == [task_obj.id]
+
+    def test_retrieve_other_users_task(self, user_obj, other_task_obj):
+        url = reverse(
+            'todo:api-v1:task-detail', kwargs={'pk': other_task_obj.id}
+        )
+        self.client.force_login(user_obj)
+        response = self.client.get(url, format='json')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_admin_scope_requires_staff(
+        self, user_obj, task_obj, other_task_obj
+    ):
+        url = reverse('todo:api-v1:task-list') + '?scope=all'
+        self.client.force_login(user_obj)
+        response = self.client.get(url, format='json')
+        assert len(response.data['results']) == 1
+
+        user_obj.is_staff = True
+        user_obj.save()
+        response = self.client.get(url, format='json')
+        assert len(response.data['results']) == 2
+
+    def test_staff_cannot_edit_other_users_task(
+        self, user_obj, other_task_obj
+    ):
+        user_obj.is_staff = True
+        user_obj.save()
+        url = reverse(
+            'todo:api-v1:task-detail', kwargs={'pk': other_task_obj.id}
+        ) + '?scope=all'
+        self.client.force_login(user_obj)
+        assert self.client.get(url).status_code == status.HTTP_200_OK
+        response = self.client.patch(url, {'title': 'x'}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,97 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..cache import bump_task_version, get_task_version
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    user = User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    Task.objects.create(user=user, title="first")
+    return user
+
+
+def task_query_count(context):
+    return len([
+        query for query in context.captured_queries
+        if '"todo_task"' in query["sql"]
+    ])
+
+
+@pytest.mark.django_db()
+class TestTaskListCache:
+    client = APIClient()
+    url = reverse("todo:api-v1:task-list")
+
+    def titles(self, url=None):
+        response = self.client.get(url or self.url)
+        return [task["title"] for task in response.data["results"]]
+
+    def test_repeat_read_is_served_from_cache(self, user_obj):
+        self.client.force_login(user_obj)
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.get(self.url)
+        # Only the aggregate behind the ETag touches the task table.
+        assert task_query_count(context) == 1
+        assert second.content == first.content
+
+    def test_query_params_are_cached_separately(self, user_obj):
+        Task.objects.create(user=user_obj, title="done", is_done=True)
+        self.client.force_login(user_obj)
+        assert self.titles() == ["done", "first"]
+        assert self.titles(self.url + "?is_done=false") == ["first"]
+        assert self.titles(self.url + "?search=do") == ["done"]
+
+    def test_writes_invalidate(
+        self, user_obj, django_capture_on_commit_callbacks
+    ):
+        self.client.force_login(user_obj)
+        assert self.titles() == ["first"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post(self.url, {"title": "second"})
+        assert self.titles() == ["first", "second"]
+
+        detail = reverse(
+            "todo:api-v1:task-detail", kwargs={"pk": response.data["id"]}
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.patch(detail, {"title": "renamed"})
+        assert self.titles() == ["first", "renamed"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.client.delete(detail)
+        assert self.titles() == ["first"]
+
+    def test_other_users_are_not_invalidated(
+        self, user_obj, django_capture_on_commit_callbacks
+    ):
+        other = User.objects.create_user(
+            email="other_email@gmail.com", password="test_password@123"
+        )
+        version = get_task_version(user_obj.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            Task.objects.create(user=other, title="other")
+        assert get_task_version(user_obj.id) == version
+
+    def test_bump_after_eviction_never_reuses_a_version(
+        self, user_obj, django_capture_on_commit_callbacks
+    ):
+        version = get_task_version(user_obj.id)
+        cache.delete(f"todo:tasks:version:{user_obj.id}")
+        with django_capture_on_commit_callbacks(execute=True):
+            bump_task_version(user_obj.id)
+        assert get_task_version(user_obj.id) > version
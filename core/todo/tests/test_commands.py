@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+
+from accounts.models import Profile
+from ..models import Task
+
+User = get_user_model()
+
+
+def create_data(*args, **kwargs):
+    call_command("create_data", *args, stdout=StringIO(), **kwargs)
+    return list(Task.objects.order_by("id").values_list("title", "is_done"))
+
+
+@pytest.mark.django_db()
+class TestCreateDataCommand:
+
+    def test_bulk_mode(self):
+        create_data("3", "4", bulk=True, batch_size=5, seed=1)
+        assert User.objects.count() == 3
+        assert Profile.objects.count() == 3
+        assert Task.objects.count() == 12
+        user = User.objects.first()
+        assert user.is_verified
+        assert user.check_password("a/123456")
+
+    def test_bulk_mode_is_reproducible_across_workers(self):
+        single = create_data("4", "3", bulk=True, batch_size=6, seed=7)
+        Task.objects.all().delete()
+        User.objects.all().delete()
+        parallel = create_data(
+            "4", "3", bulk=True, batch_size=6, seed=7, workers=2
+        )
+        assert single == parallel
+
+    def test_bulk_mode_without_bulk_returning(self, monkeypatch):
+        # SQLite before 3.35 can not return the rows of a bulk INSERT.
+        monkeypatch.setattr(
+            type(connection.features),
+            "can_return_rows_from_bulk_insert",
+            False,
+        )
+        create_data("2", "2", bulk=True, seed=1)
+        assert Profile.objects.count() == 2
+        assert set(Task.objects.values_list("user_id", flat=True)) == set(
+            User.objects.values_list("id", flat=True)
+        )
@@ -0,0 +1,92 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    user = User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    return user
+
+
+@pytest.fixture
+def task_obj(user_obj):
+    return Task.objects.create(user=user_obj, title="test_title")
+
+
+@pytest.mark.django_db()
+class TestConditionalGet:
+    client = APIClient()
+    url = reverse("todo:api-v1:task-list")
+
+    def test_list_not_modified(self, user_obj, task_obj):
+        self.client.force_login(user_obj)
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        assert etag.startswith('"')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert not response.content
+        task_queries = [
+            query["sql"] for query in context.captured_queries
+            if '"todo_task"' in query["sql"]
+        ]
+        assert len(task_queries) == 1
+        assert "MAX" in task_queries[0]
+
+    def test_list_etag_changes_on_write(self, user_obj, task_obj):
+        self.client.force_login(user_obj)
+        etag = self.client.get(self.url)["ETag"]
+
+        Task.objects.create(user=user_obj, title="second")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+        etag = response["ETag"]
+        task_obj.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_etag_depends_on_query(self, user_obj, task_obj):
+        self.client.force_login(user_obj)
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(
+            self.url + "?is_done=false", HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_if_modified_since(self, user_obj, task_obj):
+        self.client.force_login(user_obj)
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_retrieve_not_modified(self, user_obj, task_obj):
+        url = reverse("todo:api-v1:task-detail", kwargs={"pk": task_obj.pk})
+        self.client.force_login(user_obj)
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        self.client.patch(url, {"is_done": True})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["is_done"] is True
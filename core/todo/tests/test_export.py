@@ -0,0 +1,137 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def api_client(user_obj):
+    client = APIClient()
+    client.force_authenticate(user_obj)
+    return client
+
+
+def seed_tasks(user, count):
+    """
+    Insert `count` tasks with a single recursive INSERT, a lot faster than
+    bulk_create for a million rows.
+    """
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            WITH RECURSIVE seq(n) AS (
+                SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s
+            )
+            INSERT INTO todo_task
+                (user_id, title, is_done, created_date, updated_date)
+            SELECT %s, 'task ' || n, n %% 2 = 0, %s, %s FROM seq
+            """,
+            [count, user.id, now, now],
+        )
+
+
+def content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+def reset_peak_rss():
+    """
+    Reset the process' peak resident size to its current one, Linux only.
+    """
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def peak_rss():
+    """
+    Return the process' peak resident size in kilobytes since the last
+    reset.
+    """
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+
+
+@pytest.mark.django_db()
+class TestTaskExport:
+    url = reverse("todo:api-v1:task-export")
+
+    def test_ndjson(self, api_client, user_obj):
+        task = Task.objects.create(user=user_obj, title="first")
+        response = api_client.get(self.url)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert 'filename="tasks.ndjson"' in response["Content-Disposition"]
+        [line] = content(response).splitlines()
+        item = json.loads(line)
+        assert item["id"] == task.id
+        assert item["title"] == "first"
+        assert item["url"].endswith(f"/task/{task.id}/")
+
+    def test_csv(self, api_client, user_obj):
+        Task.objects.create(user=user_obj, title="with, comma")
+        response = api_client.get(self.url, {"output": "csv"})
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        header, row = csv.reader(StringIO(content(response)))
+        assert header[:5] == ["id", "url", "user", "title", "is_done"]
+        assert row[3] == "with, comma"
+
+    def test_honors_filters(self, api_client, user_obj, settings):
+        settings.TODO_EXPORT_CHUNK_SIZE = 2
+        seed_tasks(user_obj, 5)
+        other = User.objects.create_user(
+            email="other_email@gmail.com", password="test_password@123"
+        )
+        seed_tasks(other, 3)
+        response = api_client.get(self.url, {"is_done": "true"})
+        lines = content(response).splitlines()
+        assert [json.loads(line)["title"] for line in lines] == [
+            "task 2", "task 4"
+        ]
+
+    def test_unknown_output(self, api_client):
+        response = api_client.get(self.url, {"output": "xml"})
+        assert response.status_code == 400
+
+    def test_memory_is_bounded(self, api_client, user_obj):
+        # The peak resident size, tracemalloc would slow the million rows
+        # down several times over. The peak is reset first, so that an
+        # earlier test's can not hide this one's.
+        seed_tasks(user_obj, 1000000)
+        try:
+            reset_peak_rss()
+        except OSError:
+            pytest.skip("Needs Linux to reset the peak resident size")
+
+        before = peak_rss()
+        response = api_client.get(self.url)
+        rows = 0
+        for chunk in response.streaming_content:
+            rows += chunk.count(b"\n")
+        after = peak_rss()
+
+        assert rows == 1000000
+        # In kilobytes. A million materialized rows would take hundreds of
+        # megabytes.
+        assert after - before < 32 * 1024
@@ -0,0 +1,166 @@
+import json
+from io import BytesIO, StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..cache import get_task_version
+from ..importer import import_tasks
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def api_client(user_obj):
+    client = APIClient()
+    client.force_authenticate(user_obj)
+    return client
+
+
+def ndjson(*items):
+    return b"".join(json.dumps(item).encode() + b"\n" for item in items)
+
+
+@pytest.mark.django_db()
+class TestImportTasks:
+    def test_batches_and_line_errors(self, user_obj):
+        lines = BytesIO(
+            ndjson({"title": "first"}, {"title": ""})
+            + b"\n"
+            + b"not json\n"
+            + b"[1]\n"
+            + ndjson({"title": "second", "is_done": True})
+            + ndjson({"title": "third"})
+        )
+        progress = []
+        summary = import_tasks(
+            user_obj.id,
+            lines,
+            "ndjson",
+            batch_size=2,
+            progress=lambda summary: progress.append(summary["created"]),
+        )
+        assert summary["lines"] == 7
+        assert summary["created"] == 3
+        assert summary["failed"] == 3
+        assert [error["line"] for error in summary["errors"]] == [2, 4, 5]
+        assert "title" in summary["errors"][0]["errors"]
+        # After each of the two batches, then once done.
+        assert progress == [1, 3, 3]
+        assert list(
+            Task.objects.filter(user=user_obj)
+            .order_by("id")
+            .values_list("title", "is_done")
+        ) == [("first", False), ("second", True), ("third", False)]
+
+    def test_csv(self, user_obj):
+        lines = BytesIO(
+            b"\xef\xbb\xbftitle,is_done,user\r\n"
+            b'"with, comma",true,999\r\n'
+            b"defaults,,\r\n"
+        )
+        summary = import_tasks(user_obj.id, lines, "csv")
+        assert summary["created"] == 2
+        tasks = Task.objects.filter(user=user_obj).order_by("id")
+        assert [(task.title, task.is_done) for task in tasks] == [
+            ("with, comma", True), ("defaults", False)
+        ]
+
+    def test_invalid_encoding(self, user_obj):
+        lines = BytesIO(ndjson({"title": "first"}) + b'"\xff"\n')
+        summary = import_tasks(user_obj.id, lines, "ndjson")
+        assert summary["created"] == 1
+        assert summary["errors"][0]["line"] == 2
+
+    def test_errors_are_capped(self, user_obj, settings):
+        settings.TODO_IMPORT_MAX_ERRORS = 2
+        lines = BytesIO(ndjson(*[{"title": ""}] * 5))
+        summary = import_tasks(user_obj.id, lines, "ndjson")
+        assert summary["failed"] == 5
+        assert len(summary["errors"]) == 2
+
+    def test_bumps_the_task_version(
+        self, user_obj, django_capture_on_commit_callbacks
+    ):
+        version = get_task_version(user_obj.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            lines = BytesIO(ndjson({"title": "first"}))
+            import_tasks(user_obj.id, lines, "ndjson")
+        assert get_task_version(user_obj.id) > version
+
+
+@pytest.mark.django_db()
+class TestImportAPI:
+    url = reverse("todo:api-v1:task-import")
+
+    def test_upload(self, api_client, user_obj):
+        upload = SimpleUploadedFile(
+            "tasks.csv", b"title\nfirst\nsecond\n", content_type="text/csv"
+        )
+        response = api_client.post(self.url, {"file": upload})
+        assert response.status_code == 200
+        assert response.data["created"] == 2
+        assert Task.objects.filter(user=user_obj).count() == 2
+
+    def test_missing_file(self, api_client):
+        response = api_client.post(self.url, {}, format="multipart")
+        assert response.status_code == 400
+
+    def test_unknown_input(self, api_client):
+        upload = SimpleUploadedFile("tasks.txt", b"")
+        response = api_client.post(
+            self.url + "?input=xml", {"file": upload}
+        )
+        assert response.status_code == 400
+
+    def test_background(
+        self, api_client, user_obj, eager_celery, settings, tmp_path
+    ):
+        settings.MEDIA_ROOT = tmp_path
+        upload = SimpleUploadedFile(
+            "tasks.ndjson", ndjson({"title": "first"}, {"title": ""})
+        )
+        response = api_client.post(
+            self.url + "?background=1", {"file": upload}
+        )
+        assert response.status_code == 202
+        url = response.data["url"]
+
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert response.data["status"] == "done"
+        assert response.data["created"] == 1
+        assert response.data["errors"][0]["line"] == 2
+        assert "user" not in response.data
+        # The upload is removed once imported.
+        assert not any(path.is_file() for path in tmp_path.rglob("*"))
+
+        other = User.objects.create_user(
+            email="other_email@gmail.com", password="test_password@123"
+        )
+        api_client.force_authenticate(other)
+        assert api_client.get(url).status_code == 404
+
+
+@pytest.mark.django_db()
+def test_import_command(user_obj, tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    path.write_bytes(ndjson({"title": "first"}, {"title": ""}))
+    out = StringIO()
+    call_command("import_tasks", user_obj.email, str(path), stdout=out)
+    assert "created 1 tasks, rejected 1 rows" in out.getvalue()
+    assert "line 2: title:" in out.getvalue()
@@ -0,0 +1,94 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def task(user_obj):
+    return Task.objects.create(user=user_obj, title="first")
+
+
+@pytest.fixture
+def htmx_client(user_obj):
+    client = Client(HTTP_HX_REQUEST="true")
+    client.force_login(user_obj)
+    return client
+
+
+@pytest.mark.django_db()
+class TestPartialResponses:
+    def test_create(self, htmx_client, user_obj):
+        response = htmx_client.post(
+            reverse("todo:create_task"), {"title": "new"}
+        )
+        task = Task.objects.get(user=user_obj)
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert content.startswith(f'<li class="" id="task-{task.id}">')
+        assert "<span>new</span>" in content
+
+    def test_create_errors(self, htmx_client, user_obj):
+        response = htmx_client.post(
+            reverse("todo:create_task"), {"title": ""}
+        )
+        assert response.status_code == 422
+        assert not Task.objects.filter(user=user_obj).exists()
+
+    def test_toggle(self, htmx_client, task):
+        url = reverse("todo:toggle_task", kwargs={"pk": task.id})
+        with CaptureQueriesContext(connection) as context:
+            response = htmx_client.post(url)
+        assert response.status_code == 200
+        assert f'<li class="done" id="task-{task.id}">' in (
+            response.content.decode()
+        )
+        # The toggle itself and the read of the row to render, plus the
+        # read of the new state where UPDATE ... RETURNING is missing.
+        returning = connection.features.can_return_columns_from_insert
+        assert len([
+            query for query in context.captured_queries
+            if '"todo_task"' in query["sql"]
+        ]) == (2 if returning else 3)
+
+    def test_update(self, htmx_client, task):
+        url = reverse("todo:edit_task", kwargs={"pk": task.id})
+        response = htmx_client.post(url, {"title": "renamed"})
+        assert response.status_code == 200
+        assert "<span>renamed</span>" in response.content.decode()
+
+    def test_delete(self, htmx_client, task):
+        url = reverse("todo:delete_task", kwargs={"pk": task.id})
+        response = htmx_client.post(url)
+        assert response.status_code == 204
+        assert not Task.objects.filter(id=task.id).exists()
+
+    def test_query_param(self, user_obj, task):
+        client = Client()
+        client.force_login(user_obj)
+        url = reverse("todo:toggle_task", kwargs={"pk": task.id})
+        assert client.post(url + "?partial").status_code == 200
+        assert client.post(url).status_code == 302
+
+    def test_other_users_task(self, htmx_client):
+        other = User.objects.create_user(
+            email="other_email@gmail.com", password="test_password@123"
+        )
+        task = Task.objects.create(user=other, title="other")
+        url = reverse("todo:delete_task", kwargs={"pk": task.id})
+        assert htmx_client.post(url).status_code == 404
@@ -0,0 +1,111 @@
+import re
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Task
+from ..tasks import delete_all_tasks
+
+User = get_user_model()
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite",
+    reason="EXPLAIN QUERY PLAN checks are written for SQLite",
+)
+
+FULL_SCAN = re.compile(r"\bSCAN (TABLE )?todo_task\b")
+
+
+def task_queries(queries):
+    return [
+        query["sql"] for query in queries
+        if '"todo_task"' in query["sql"]
+        and not query["sql"].startswith(("SAVEPOINT", "RELEASE"))
+    ]
+
+
+def full_scans(queries):
+    """
+    Return the captured todo_task queries whose plan scans the whole table.
+    """
+    scans = []
+    with connection.cursor() as cursor:
+        for sql in task_queries(queries):
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            plan = [row[-1] for row in cursor.fetchall()]
+            if any(FULL_SCAN.search(detail) for detail in plan):
+                scans.append((sql, plan))
+    return scans
+
+
+@pytest.fixture
+def user_obj():
+    user = User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    Task.objects.bulk_create(
+        Task(user=user, title=f"task {i}", is_done=i % 2 == 0)
+        for i in range(10)
+    )
+    return user
+
+
+@pytest.mark.django_db()
+class TestTaskQueryPlan:
+    client = APIClient()
+
+    def capture(self, method, url, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, **kwargs)
+        assert response.status_code < 400
+        assert task_queries(context.captured_queries)
+        return context.captured_queries
+
+    def test_api_list(self, user_obj):
+        self.client.force_login(user_obj)
+        queries = self.capture("get", reverse("todo:api-v1:task-list"))
+        assert full_scans(queries) == []
+
+    @pytest.mark.parametrize("query", [
+        "?is_done=true",
+        "?created_date__gte=2000-01-01T00:00:00Z",
+        "?created_date__lte=2100-01-01T00:00:00Z&page_size=3",
+    ])
+    def test_api_filtered_list(self, user_obj, query):
+        self.client.force_login(user_obj)
+        url = reverse("todo:api-v1:task-list") + query
+        queries = self.capture("get", url)
+        assert full_scans(queries) == []
+
+    def test_api_next_page(self, user_obj):
+        self.client.force_login(user_obj)
+        url = reverse("todo:api-v1:task-list") + "?page_size=3"
+        next_url = self.client.get(url).data["next"]
+        queries = self.capture("get", next_url)
+        assert full_scans(queries) == []
+
+    def test_api_detail(self, user_obj):
+        task = Task.objects.filter(user=user_obj).first()
+        url = reverse("todo:api-v1:task-detail", kwargs={"pk": task.pk})
+        self.client.force_login(user_obj)
+        queries = self.capture("get", url)
+        queries += self.capture("patch", url, data={"is_done": True})
+        queries += self.capture("delete", url)
+        assert full_scans(queries) == []
+
+    def test_web_list(self, user_obj):
+        self.client.force_login(user_obj)
+        queries = self.capture("get", reverse("todo:list_task"))
+        assert full_scans(queries) == []
+
+    def test_delete_all_tasks(self, user_obj):
+        with CaptureQueriesContext(connection) as context:
+            delete_all_tasks()
+        assert task_queries(context.captured_queries)
+        assert full_scans(context.captured_queries) == []
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import parsers, renderers
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+from ..models import Task
+
+User = get_user_model()
+
+pytest.importorskip("orjson")
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def api_client(user_obj):
+    client = APIClient()
+    client.force_authenticate(user_obj)
+    return client
+
+
+DATA = {
+    "title": "line separator",
+    "lazy": gettext_lazy("Not found."),
+    "amount": Decimal("1.50"),
+    "errors": {0: ["Not found."]},
+}
+
+
+class TestORJSONRenderer:
+    def test_matches_the_stock_renderer(self):
+        content = ORJSONRenderer().render(DATA)
+        assert content == JSONRenderer().render(DATA)
+        assert b"\\u2028" in content
+
+    def test_datetimes(self):
+        moment = datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc)
+        content = ORJSONRenderer().render({"at": moment})
+        assert json.loads(content) == {"at": "2024-01-02T03:04:05.678901Z"}
+
+    def test_indent_uses_the_stock_renderer(self):
+        content = ORJSONRenderer().render(
+            DATA, "application/json; indent=4"
+        )
+        assert content == JSONRenderer().render(
+            DATA, "application/json; indent=4"
+        )
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, "orjson", None)
+        assert ORJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+
+class TestORJSONParser:
+    def test_parse(self):
+        assert ORJSONParser().parse(BytesIO(b'{"title": "a"}')) == {
+            "title": "a"
+        }
+
+    @pytest.mark.parametrize("content", [b"{", b'{"a": NaN}'])
+    def test_invalid(self, content):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(BytesIO(content))
+
+    def test_other_encodings(self):
+        content = '{"title": "é"}'.encode("latin-1")
+        assert ORJSONParser().parse(
+            BytesIO(content), parser_context={"encoding": "latin-1"}
+        ) == {"title": "é"}
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(parsers, "orjson", None)
+        assert ORJSONParser().parse(BytesIO(b"[1]")) == [1]
+
+
+@pytest.mark.django_db()
+class TestTaskAPI:
+    url = reverse("todo:api-v1:task-list")
+
+    def test_round_trip(self, api_client, user_obj):
+        response = api_client.post(
+            self.url, {"title": "first"}, format="json"
+        )
+        assert response.status_code == 201
+        response = api_client.get(self.url)
+        assert response["Content-Type"] == "application/json"
+        [task] = json.loads(response.content)["results"]
+        assert task["title"] == "first"
+        assert task["created_date"].endswith("Z")
+
+    def test_msgpack(self, api_client, user_obj):
+        msgpack = pytest.importorskip("msgpack")
+        Task.objects.create(user=user_obj, title="first")
+        response = api_client.get(
+            self.url, HTTP_ACCEPT="application/msgpack"
+        )
+        assert response["Content-Type"] == "application/msgpack"
+        data = msgpack.unpackb(response.content)
+        assert data["results"][0]["title"] == "first"
+
+
+def test_benchmark_command():
+    out = StringIO()
+    call_command(
+        "benchmark_renderers", "--rows", "10", "--repeat", "1", stdout=out
+    )
+    assert "orjson" in out.getvalue()
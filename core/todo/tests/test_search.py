@@ -0,0 +1,167 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .. import search
+from ..models import Task
+
+User = get_user_model()
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="exercises the FTS5 index"
+)
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def api_client(user_obj):
+    client = APIClient()
+    client.force_authenticate(user_obj)
+    return client
+
+
+def titles(response):
+    return [task["title"] for task in response.data["results"]]
+
+
+def indexed(term):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid FROM todo_task_fts WHERE todo_task_fts MATCH %s",
+            [term],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db()
+class TestTaskSearch:
+    url = reverse("todo:api-v1:task-list")
+
+    def test_index_follows_writes(self, user_obj):
+        task = Task.objects.create(user=user_obj, title="write report")
+        assert indexed("report") == [task.id]
+
+        Task.objects.filter(id=task.id).update(title="buy milk")
+        assert indexed("report") == []
+        assert indexed("milk") == [task.id]
+
+        Task.objects.bulk_create([Task(user=user_obj, title="more milk")])
+        assert len(indexed("milk")) == 2
+
+        Task.objects.filter(user=user_obj).delete()
+        assert indexed("milk") == []
+
+    def test_prefix_match_on_words(self, api_client, user_obj):
+        Task.objects.bulk_create([
+            Task(user=user_obj, title="Write the report"),
+            Task(user=user_obj, title="rewrite notes"),
+            Task(user=user_obj, title="Reply to writers"),
+        ])
+        response = api_client.get(self.url, {"search": "wri"})
+        assert sorted(titles(response)) == [
+            "Reply to writers", "Write the report"
+        ]
+        response = api_client.get(self.url, {"search": "wri rep"})
+        assert sorted(titles(response)) == [
+            "Reply to writers", "Write the report"
+        ]
+        response = api_client.get(self.url, {"search": "wri notes"})
+        assert titles(response) == []
+
+    def test_ranked(self, api_client, user_obj):
+        Task.objects.bulk_create([
+            Task(user=user_obj, title="call mom about the garden party"),
+            Task(user=user_obj, title="garden"),
+            Task(user=user_obj, title="water the garden"),
+        ])
+        response = api_client.get(self.url, {"search": "garden"})
+        assert titles(response) == [
+            "garden", "water the garden", "call mom about the garden party"
+        ]
+
+        response = api_client.get(
+            self.url, {"search": "garden", "ordering": "id"}
+        )
+        assert titles(response)[0] == "call mom about the garden party"
+
+    def test_ranked_pages(self, api_client, user_obj):
+        Task.objects.bulk_create(
+            Task(user=user_obj, title="garden " + "x " * index)
+            for index in range(5)
+        )
+        expected = titles(api_client.get(self.url, {"search": "garden"}))
+        assert len(expected) == 5
+
+        seen = []
+        response = api_client.get(
+            self.url, {"search": "garden", "page_size": 2}
+        )
+        seen += titles(response)
+        while response.data["next"]:
+            response = api_client.get(response.data["next"])
+            seen += titles(response)
+        assert seen == expected
+
+        previous = api_client.get(response.data["previous"])
+        assert titles(previous) == expected[2:4]
+
+    def test_other_users_tasks(self, api_client):
+        other = User.objects.create_user(
+            email="other_email@gmail.com", password="test_password@123"
+        )
+        Task.objects.create(user=other, title="garden")
+        assert titles(api_client.get(self.url, {"search": "garden"})) == []
+
+    def test_dropped_triggers_are_restored(
+        self, api_client, user_obj, monkeypatch
+    ):
+        monkeypatch.setattr(search, "_fts_tables", {})
+        task = Task.objects.create(user=user_obj, title="write report")
+        # As a migration rebuilding todo_task leaves it.
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER todo_task_fts_update")
+        Task.objects.filter(id=task.id).update(title="buy milk")
+
+        assert search.get_search_backend(connection) is None
+        response = api_client.get(self.url, {"search": "mil"})
+        assert titles(response) == ["buy milk"]
+
+        emit_post_migrate_signal(0, False, connection.alias)
+        assert search.get_search_backend(connection) == "fts5"
+        assert indexed("report") == []
+        assert indexed("milk") == [task.id]
+        Task.objects.filter(id=task.id).update(title="call mom")
+        assert indexed("mom") == [task.id]
+
+    def test_punctuation_only(self, api_client, user_obj):
+        Task.objects.create(user=user_obj, title="100% done")
+        assert titles(api_client.get(self.url, {"search": "%"})) == []
+
+    def test_like_fallback(self, api_client, user_obj, monkeypatch):
+        monkeypatch.setattr(search, "get_search_backend", lambda conn: None)
+        Task.objects.create(user=user_obj, title="rewrite notes")
+        response = api_client.get(self.url, {"search": "wri"})
+        assert titles(response) == ["rewrite notes"]
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            "benchmark_search", "--rows", "200", "--users", "2",
+            "--repeat", "1", stdout=out,
+        )
+        assert "index, one user" in out.getvalue()
+        assert not Task.objects.exists()
@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from ..api.v1.serializers import TaskListSerializer, TaskSerializer
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    user = User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    Task.objects.bulk_create(
+        Task(user=user, title=title, is_done=i % 2 == 0)
+        for i, title in enumerate(
+            ["plain", "ünïcödé ✓", 'quote " and \\ slash', "", "x" * 225]
+        )
+    )
+    return user
+
+
+def model_serializer_data(queryset, path):
+    request = Request(
+        APIRequestFactory().get(path), parser_context={"kwargs": {}}
+    )
+    return TaskSerializer(queryset, many=True, context={"request": request}).data
+
+
+@pytest.mark.django_db()
+class TestTaskListSerializer:
+    client = APIClient()
+
+    def test_matches_model_serializer(self, user_obj):
+        path = reverse("todo:api-v1:task-list")
+        queryset = Task.objects.order_by("-is_done", "id")
+        request = Request(APIRequestFactory().get(path))
+
+        fast = TaskListSerializer(
+            queryset.values(*TaskListSerializer.value_fields),
+            many=True,
+            context={"request": request},
+        ).data
+        expected = model_serializer_data(queryset, path)
+        renderer = JSONRenderer()
+        assert renderer.render(fast) == renderer.render(expected)
+
+    def test_list_response_is_byte_identical(self, user_obj):
+        path = reverse("todo:api-v1:task-list")
+        self.client.force_login(user_obj)
+        response = self.client.get(path)
+
+        queryset = Task.objects.order_by("-is_done", "id")
+        expected = {
+            "next": None,
+            "previous": None,
+            "results": model_serializer_data(queryset, path),
+        }
+        assert response.content == JSONRenderer().render(expected)
+
+    def test_list_query_count_is_constant(self, user_obj):
+        path = reverse("todo:api-v1:task-list")
+        self.client.force_login(user_obj)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(path)
+        Task.objects.bulk_create(
+            Task(user=user_obj, title=f"task {i}") for i in range(40)
+        )
+        with CaptureQueriesContext(connection) as large:
+            # A different query string, so the cached list is not reused.
+            self.client.get(path + "?page_size=50")
+        assert len(large.captured_queries) == len(small.captured_queries)
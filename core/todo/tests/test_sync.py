@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from celery import current_app
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import Task, TaskTombstone
+from ..sync import encode_watermark
+from ..tasks import prune_task_tombstones
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    user = User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+    return user
+
+
+@pytest.fixture
+def task_obj(user_obj):
+    return Task.objects.create(user=user_obj, title="test_title")
+
+
+@pytest.mark.django_db()
+class TestTaskChanges:
+    client = APIClient()
+    url = reverse("todo:api-v1:task-changes")
+
+    def sync(self, since=None):
+        url = self.url
+        if since is not None:
+            url += "?since=" + since
+        response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_full_sync(self, user_obj, task_obj):
+        self.client.force_login(user_obj)
+        data = self.sync()
+        assert data["created"] == [task_obj.id]
+        assert data["updated"] == data["deleted"] == []
+        assert data["watermark"]
+
+    def test_changes_since_watermark(self, user_obj, task_obj, settings):
+        settings.TODO_SYNC_MARGIN_SECONDS = 0
+        untouched = Task.objects.create(user=user_obj, title="untouched")
+        deleted = Task.objects.create(user=user_obj, title="deleted")
+        self.client.force_login(user_obj)
+        watermark = self.sync()["watermark"]
+
+        created = Task.objects.create(user=user_obj, title="created")
+        task_obj.title = "updated"
+        task_obj.save()
+        deleted_id = deleted.id
+        deleted.delete()
+
+        data = self.sync(watermark)
+        assert data["created"] == [created.id]
+        assert data["updated"] == [task_obj.id]
+        assert data["deleted"] == [deleted_id]
+        assert untouched.id not in data["created"] + data["updated"]
+
+    def test_watermark_margin_repeats_recent_changes(self, user_obj, task_obj):
+        self.client.force_login(user_obj)
+        watermark = self.sync()["watermark"]
+        assert self.sync(watermark)["created"] == [task_obj.id]
+
+    def test_other_users_changes_are_hidden(self, user_obj):
+        other = User.objects.create_user(
+            email="other_email@gmail.com", password="test_password@123"
+        )
+        Task.objects.create(user=other, title="other").delete()
+        self.client.force_login(user_obj)
+        since = encode_watermark(timezone.now() - timedelta(hours=1))
+        data = self.sync(since)
+        assert data["created"] == data["deleted"] == []
+
+    def test_invalid_watermark(self, user_obj):
+        self.client.force_login(user_obj)
+        response = self.client.get(self.url + "?since=forged")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_expired_watermark(self, user_obj):
+        self.client.force_login(user_obj)
+        since = encode_watermark(timezone.now() - timedelta(days=365))
+        response = self.client.get(self.url + "?since=" + since)
+        assert response.status_code == status.HTTP_410_GONE
+
+
+@pytest.mark.django_db()
+class TestTaskTombstone:
+
+    def test_user_deletion_leaves_no_tombstones(self, user_obj, task_obj):
+        user_obj.delete()
+        assert not TaskTombstone.objects.exists()
+
+    def test_prune_task_tombstones(self, user_obj, task_obj):
+        task_obj.delete()
+        TaskTombstone.objects.update(
+            deleted_date=timezone.now() - timedelta(days=365)
+        )
+        prune_task_tombstones()
+        assert not TaskTombstone.objects.exists()
+
+    def test_pruning_is_scheduled(self):
+        schedule = current_app.conf.beat_schedule
+        assert prune_task_tombstones.name in [
+            entry["task"] for entry in schedule.values()
+        ]
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import pytest
+from celery import current_app
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models import Task, TaskTombstone
+from ..tasks import delete_all_tasks, dispatch_purge, partition_user_ids
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def no_pause(settings):
+    settings.TODO_PURGE_PAUSE_SECONDS = 0
+
+
+@pytest.fixture
+def users():
+    verified = User.objects.create_user(
+        email="verified@gmail.com", password="a/123456", is_verified=True
+    )
+    unverified = User.objects.create_user(
+        email="unverified@gmail.com", password="a/123456"
+    )
+    for user in (verified, unverified):
+        Task.objects.bulk_create(
+            Task(user=user, title=f"task {i}", is_done=i % 2 == 0)
+            for i in range(10)
+        )
+    return verified, unverified
+
+
+@pytest.mark.django_db()
+class TestDeleteAllTasks:
+
+    def test_deletes_completed_tasks_of_verified_users(self, users):
+        verified, unverified = users
+        result = delete_all_tasks(batch_size=3)
+        assert result["deleted"] == 5
+        assert result["batches"] == 2
+        assert not Task.objects.filter(user=verified, is_done=True).exists()
+        assert Task.objects.filter(user=verified).count() == 5
+        assert Task.objects.filter(user=unverified).count() == 10
+        assert TaskTombstone.objects.filter(user=verified).count() == 5
+
+    def test_dry_run(self, users):
+        result = delete_all_tasks(dry_run=True)
+        assert result["deleted"] == 5
+        assert result["dry_run"] is True
+        assert Task.objects.count() == 20
+
+    def test_age_threshold(self, users):
+        verified, _ = users
+        old = Task.objects.filter(user=verified, is_done=True)[:2]
+        Task.objects.filter(id__in=[task.id for task in old]).update(
+            updated_date=timezone.now() - timedelta(days=10)
+        )
+        result = delete_all_tasks(older_than_days=7)
+        assert result["deleted"] == 2
+        assert Task.objects.filter(user=verified, is_done=True).count() == 3
+
+    def test_reports_throughput(self, users):
+        result = delete_all_tasks()
+        assert result["duration"] >= 0
+        assert result["rows_per_second"] >= 0
+
+
+@pytest.mark.django_db()
+class TestParallelPurge:
+
+    def test_partitions_cover_verified_users(self):
+        ids = [
+            User.objects.create_user(
+                email=f"user{i}@gmail.com", password="a", is_verified=True
+            ).id
+            for i in range(5)
+        ]
+        ranges = partition_user_ids(2)
+        assert len(ranges) == 2
+        assert ranges[0][0] == ids[0]
+        assert ranges[-1][1] == ids[-1] + 1
+        assert ranges[0][1] == ranges[1][0]
+
+    def test_app_can_start_chords(self):
+        # Outside eager mode the chord's header results are gathered in
+        # the result backend, which the disabled one refuses to do.
+        app = current_app._get_current_object()
+        assert app.conf.result_backend
+        app.backend.ensure_chords_allowed()
+
+    def test_no_verified_users(self, eager_celery):
+        assert partition_user_ids(4) == []
+        assert dispatch_purge().get() == {"deleted": 0, "partitions": []}
+
+    def test_fan_out(self, users, eager_celery):
+        for i in range(3):
+            user = User.objects.create_user(
+                email=f"user{i}@gmail.com", password="a", is_verified=True
+            )
+            Task.objects.create(user=user, title="done", is_done=True)
+
+        result = dispatch_purge(concurrency=3, batch_size=2).get()
+        assert result["deleted"] == 8
+        assert len(result["partitions"]) == 3
+        assert sum(p["deleted"] for p in result["partitions"]) == 8
+        assert not Task.objects.filter(
+            is_done=True, user__is_verified=True
+        ).exists()
+        assert Task.objects.filter(is_done=True).count() == 5
@@ -0,0 +1,142 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..cache import get_task_version
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def task(user_obj):
+    return Task.objects.create(user=user_obj, title="first")
+
+
+@pytest.fixture
+def other_task():
+    other = User.objects.create_user(
+        email="other_email@gmail.com", password="test_password@123"
+    )
+    return Task.objects.create(user=other, title="other")
+
+
+def update_queries(context):
+    return [
+        query["sql"] for query in context.captured_queries
+        if query["sql"].startswith("UPDATE")
+    ]
+
+
+def select_queries(context):
+    return [
+        query["sql"] for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+    ]
+
+
+@pytest.mark.django_db()
+class TestToggle:
+    def test_flips_in_one_statement(
+        self, task, user_obj, django_capture_on_commit_callbacks
+    ):
+        version = get_task_version(user_obj.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            with CaptureQueriesContext(connection) as context:
+                assert Task.objects.toggle(task.id, user_obj.id) is True
+        assert len(update_queries(context)) == 1
+        # Without UPDATE ... RETURNING the new state is read back.
+        returning = connection.features.can_return_columns_from_insert
+        assert len(select_queries(context)) == (0 if returning else 1)
+        refreshed = Task.objects.get(id=task.id)
+        assert refreshed.is_done is True
+        assert refreshed.updated_date > task.updated_date
+        assert get_task_version(user_obj.id) > version
+
+        assert Task.objects.toggle(task.id, user_obj.id) is False
+
+    def test_fallback_without_returning(
+        self, task, user_obj, monkeypatch
+    ):
+        monkeypatch.setattr(
+            connection.features, "can_return_columns_from_insert", False
+        )
+        with CaptureQueriesContext(connection) as context:
+            assert Task.objects.toggle(task.id, user_obj.id) is True
+        [sql] = update_queries(context)
+        assert "RETURNING" not in sql
+        assert "CASE WHEN" in sql
+        assert len(select_queries(context)) == 1
+        assert Task.objects.get(id=task.id).is_done is True
+
+        assert Task.objects.toggle(task.id, user_obj.id) is False
+        assert Task.objects.get(id=task.id).is_done is False
+        assert Task.objects.toggle(task.id + 1000, user_obj.id) is None
+
+    def test_other_users_task(self, other_task, user_obj):
+        assert Task.objects.toggle(other_task.id, user_obj.id) is None
+        assert Task.objects.get(id=other_task.id).is_done is False
+
+    def test_api_action(self, task, other_task, user_obj):
+        client = APIClient()
+        client.force_authenticate(user_obj)
+        url = reverse("todo:api-v1:task-toggle", kwargs={"pk": task.id})
+        response = client.post(url)
+        assert response.status_code == 200
+        assert response.data == {"id": task.id, "is_done": True}
+
+        url = reverse(
+            "todo:api-v1:task-toggle", kwargs={"pk": other_task.id}
+        )
+        assert client.post(url).status_code == 404
+
+    def test_web_view(self, task, other_task, user_obj):
+        client = Client()
+        client.force_login(user_obj)
+        response = client.post(
+            reverse("todo:toggle_task", kwargs={"pk": task.id})
+        )
+        assert response.status_code == 302
+        assert Task.objects.get(id=task.id).is_done is True
+
+        response = client.post(
+            reverse("todo:toggle_task", kwargs={"pk": other_task.id})
+        )
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db()
+class TestTaskUpdateView:
+    def test_only_changed_columns_are_written(self, task, user_obj):
+        client = Client()
+        client.force_login(user_obj)
+        url = reverse("todo:edit_task", kwargs={"pk": task.id})
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, {"title": "renamed"})
+        assert response.status_code == 302
+        [sql] = update_queries(context)
+        assert '"title"' in sql
+        assert '"updated_date"' in sql
+        assert '"is_done"' not in sql
+        assert Task.objects.get(id=task.id).title == "renamed"
+
+    def test_unchanged_form_writes_nothing(self, task, user_obj):
+        client = Client()
+        client.force_login(user_obj)
+        url = reverse("todo:edit_task", kwargs={"pk": task.id})
+        with CaptureQueriesContext(connection) as context:
+            client.post(url, {"title": "first"})
+        assert update_queries(context) == []
@@ -0,0 +1,330 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..weather import (
+    afetch_weather,
+    aget_weather,
+    fetch_weather,
+    get_async_client,
+    get_weather,
+    weather_breaker,
+    weather_cache_keys,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def reset_breaker():
+    weather_breaker.reset()
+    yield
+    weather_breaker.reset()
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    """
+    Answers like the weather API: "tehran" is known, "slow" answers after
+    a delay and everything else is a 404. Every call fails while the
+    server is down, and answers with `status` while it is set.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            city = parse_qs(urlparse(self.path).query)["q"][0]
+            if city == "slow":
+                time.sleep(server.delay)
+            if server.down:
+                code, body = 500, {"cod": "500"}
+            elif server.status:
+                code, body = server.status, {"cod": str(server.status)}
+            elif city in ("tehran", "slow"):
+                code, body = 200, {"name": city, "main": {"temp": 20}}
+            else:
+                code, body = 404, {"cod": "404"}
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def weather_server(settings):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWeatherHandler)
+    server.lock = threading.Lock()
+    server.active = server.peak = server.hits = 0
+    server.delay = 0.2
+    server.down = False
+    server.status = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.WEATHER_API = {
+        "URL": "http://127.0.0.1:%d/weather" % server.server_port,
+        "KEY": "test",
+        "CONNECT_TIMEOUT": 1.0,
+        "READ_TIMEOUT": 1.0,
+        "MAX_CONNECTIONS": 2,
+        "MAX_KEEPALIVE_CONNECTIONS": 2,
+    }
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestFetchWeather:
+    def test_found(self, weather_server):
+        status_code, data = fetch_weather("tehran")
+        assert status_code == 200
+        assert data["name"] == "tehran"
+
+    def test_not_found(self, weather_server):
+        assert fetch_weather("nowhere") == (404, {"error": "City not found"})
+
+    def test_read_timeout(self, weather_server, settings):
+        settings.WEATHER_API["READ_TIMEOUT"] = 0.05
+        status_code, _ = fetch_weather("slow")
+        assert status_code == 503
+
+    def test_async_found(self, weather_server):
+        status_code, data = async_to_sync(afetch_weather)("tehran")
+        assert status_code == 200
+        assert data["name"] == "tehran"
+
+    def test_async_read_timeout(self, weather_server, settings):
+        settings.WEATHER_API["READ_TIMEOUT"] = 0.05
+        status_code, _ = async_to_sync(afetch_weather)("slow")
+        assert status_code == 503
+
+    def test_async_concurrency_is_bounded(self, weather_server):
+        async def fetch_many():
+            return await asyncio.gather(
+                *(afetch_weather("slow") for _ in range(6))
+            )
+
+        results = async_to_sync(fetch_many)()
+        assert [code for code, _ in results] == [200] * 6
+        assert weather_server.peak <= 2
+
+
+    def test_async_client_is_closed_with_its_loop(self, weather_server):
+        async def fetch():
+            assert (await afetch_weather("tehran"))[0] == 200
+            client, _ = await get_async_client()
+            assert not client.is_closed
+            return client
+
+        assert async_to_sync(fetch)().is_closed
+        assert asyncio.run(fetch()).is_closed
+
+
+class TestWeatherCache:
+    def test_city_names_are_normalized(self, weather_server):
+        assert get_weather("Tehran")[0] == 200
+        assert get_weather("  TEHRAN ")[0] == 200
+        assert weather_server.hits == 1
+
+    def test_not_found_is_cached(self, weather_server):
+        assert get_weather("nowhere")[0] == 404
+        assert get_weather("Nowhere")[0] == 404
+        assert weather_server.hits == 1
+
+    def test_failures_are_not_cached(self, weather_server, settings):
+        settings.WEATHER_API["READ_TIMEOUT"] = 0.05
+        assert get_weather("slow")[0] == 503
+        assert get_weather("slow")[0] == 503
+        assert weather_server.hits == 2
+
+    @pytest.mark.parametrize("status", [400, 401, 429])
+    def test_client_errors_are_not_cached(self, weather_server, status):
+        weather_server.status = status
+        assert get_weather("tehran") == (
+            503, {"error": "Weather service unavailable"}, False
+        )
+        assert cache.get(weather_cache_keys("tehran").entry) is None
+        weather_server.status = None
+        assert get_weather("tehran")[0] == 200
+        assert weather_server.hits == 2
+
+    def test_concurrent_misses_are_coalesced(self, weather_server):
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(get_weather, ["slow"] * 5))
+        assert [result[0] for result in results] == [200] * 5
+        assert weather_server.hits == 1
+
+    def test_async_concurrent_misses_are_coalesced(self, weather_server):
+        async def fetch_many():
+            return await asyncio.gather(
+                *(aget_weather("slow") for _ in range(5))
+            )
+
+        results = async_to_sync(fetch_many)()
+        assert [result[0] for result in results] == [200] * 5
+        assert weather_server.hits == 1
+
+    def test_stale_entry_is_served_while_refreshed(
+        self, weather_server, settings, eager_celery
+    ):
+        settings.WEATHER_API["TIMEOUT"] = 0
+        get_weather("tehran")
+        keys = weather_cache_keys("tehran")
+        stale = cache.get(keys.entry)
+
+        status_code, data, degraded = get_weather("tehran")
+        assert status_code == 200
+        assert data == stale["data"]
+        assert not degraded
+        assert weather_server.hits == 2
+        assert cache.get(keys.entry)["expires"] > stale["expires"]
+        assert cache.get(keys.refresh) is None
+
+
+class TestCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def breaker_settings(self, weather_server, settings):
+        settings.WEATHER_API["BREAKER_MIN_CALLS"] = 4
+        settings.WEATHER_API["BREAKER_FAILURE_RATE"] = 0.5
+
+    def trip(self, server):
+        server.down = True
+        for _ in range(4):
+            assert fetch_weather("tehran")[0] == 503
+
+    def test_opens_on_failure_rate(self, weather_server):
+        fetch_weather("tehran")
+        fetch_weather("tehran")
+        assert weather_breaker.stats()["state"] == "closed"
+        self.trip(weather_server)
+        assert weather_breaker.stats()["state"] == "open"
+
+        hits = weather_server.hits
+        rejected = weather_breaker.stats()["rejected"]
+        assert fetch_weather("tehran")[0] == 503
+        assert async_to_sync(afetch_weather)("tehran")[0] == 503
+        assert weather_server.hits == hits
+        assert weather_breaker.stats()["rejected"] == rejected + 2
+
+    @pytest.mark.parametrize("status", [401, 429])
+    def test_client_errors_are_failures(self, weather_server, status):
+        weather_server.status = status
+        for _ in range(2):
+            assert fetch_weather("tehran")[0] == 503
+            assert async_to_sync(afetch_weather)("tehran")[0] == 503
+        stats = weather_breaker.stats()
+        assert stats["state"] == "open"
+        assert stats["failures"] == 4
+
+    def test_not_found_is_a_success(self, weather_server):
+        for _ in range(4):
+            assert fetch_weather("nowhere")[0] == 404
+        stats = weather_breaker.stats()
+        assert stats["state"] == "closed"
+        assert stats["failures"] == 0
+
+    def test_stays_closed_below_failure_rate(self, weather_server):
+        for _ in range(4):
+            fetch_weather("tehran")
+        weather_server.down = True
+        for _ in range(3):
+            fetch_weather("tehran")
+        assert weather_breaker.stats()["state"] == "closed"
+
+    def test_half_open_probe_closes(self, weather_server, settings):
+        self.trip(weather_server)
+        settings.WEATHER_API["BREAKER_RESET_TIMEOUT"] = 0
+        weather_server.down = False
+        assert fetch_weather("tehran")[0] == 200
+        assert weather_breaker.stats()["state"] == "closed"
+
+    def test_failed_probe_reopens(self, weather_server, settings):
+        self.trip(weather_server)
+        settings.WEATHER_API["BREAKER_RESET_TIMEOUT"] = 0
+        assert fetch_weather("tehran")[0] == 503
+        stats = weather_breaker.stats()
+        assert stats["state"] == "open"
+        assert stats["opened"] == 2
+
+    def test_only_one_probe_at_a_time(self, weather_server, settings):
+        self.trip(weather_server)
+        settings.WEATHER_API["BREAKER_RESET_TIMEOUT"] = 0
+        assert weather_breaker.allow()
+        assert not weather_breaker.allow()
+
+    def test_last_good_data_is_served_degraded(self, weather_server):
+        _, data, _ = get_weather("tehran")
+        cache.delete(weather_cache_keys("tehran").entry)
+        self.trip(weather_server)
+        assert get_weather("tehran") == (200, data, True)
+        assert async_to_sync(aget_weather)("tehran") == (200, data, True)
+
+    def test_unknown_city_without_last_good(self, weather_server):
+        self.trip(weather_server)
+        assert get_weather("tehran") == (
+            503, {"error": "Weather service unavailable"}, False
+        )
+
+
+@pytest.mark.django_db()
+class TestWeatherViews:
+    def test_sync_view(self, weather_server):
+        url = reverse("todo:api-v1:weather", kwargs={"city_name": "tehran"})
+        response = APIClient().get(url)
+        assert response.status_code == 200
+        assert response.json()["name"] == "tehran"
+
+    def test_async_view(self, weather_server):
+        url = reverse(
+            "todo:api-v1:weather-async", kwargs={"city_name": "nowhere"}
+        )
+        response = async_to_sync(AsyncClient().get)(url)
+        assert response.status_code == 404
+        assert response.json() == {"error": "City not found"}
+
+    def test_degraded_response_is_flagged(self, weather_server):
+        url = reverse("todo:api-v1:weather", kwargs={"city_name": "tehran"})
+        client = APIClient()
+        assert "X-Weather-Stale" not in client.get(url)
+        cache.delete(weather_cache_keys("tehran").entry)
+        weather_server.down = True
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response["X-Weather-Stale"] == "1"
+
+    def test_status_is_for_staff(self):
+        url = reverse("todo:api-v1:weather-status")
+        client = APIClient()
+        user = User.objects.create_user(
+            email="test_email@gmail.com", password="test_password@123"
+        )
+        client.force_authenticate(user)
+        assert client.get(url).status_code == 403
+
+        user.is_staff = True
+        user.save()
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data["state"] == "closed"
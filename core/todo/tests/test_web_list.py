@@ -0,0 +1,103 @@
+import re
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Task
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_obj():
+    return User.objects.create_user(
+        email="test_email@gmail.com",
+        password="test_password@123",
+        is_verified=True
+    )
+
+
+@pytest.fixture
+def tasks(user_obj, settings):
+    settings.TODO_WEB_PAGE_SIZE = 2
+    return [
+        Task.objects.create(user=user_obj, title=f"task {i}")
+        for i in range(3)
+    ]
+
+
+def rows(response):
+    return re.findall(r"<span>(task \d)</span>", response.content.decode())
+
+
+def task_queries(context):
+    return [
+        query["sql"] for query in context.captured_queries
+        if '"todo_task"' in query["sql"]
+    ]
+
+
+@pytest.mark.django_db()
+class TestTaskListView:
+    url = reverse("todo:list_task")
+
+    def client_for(self, user, **kwargs):
+        client = Client(**kwargs)
+        client.force_login(user)
+        return client
+
+    def test_paginated(self, user_obj, tasks):
+        client = self.client_for(user_obj)
+        assert rows(client.get(self.url)) == ["task 0", "task 1"]
+        assert rows(client.get(self.url + "?page=2")) == ["task 2"]
+        assert client.get(self.url + "?page=3").status_code == 404
+
+    def test_rows_link_to_their_task(self, user_obj, tasks):
+        content = self.client_for(user_obj).get(self.url).content.decode()
+        task = tasks[0]
+        assert f'formaction="/toggle_task/{task.id}/"' in content
+        assert f'formaction="/delete/{task.id}/"' in content
+        assert f"location.href='/edit/{task.id}/'" in content
+
+    def test_page_is_served_from_cache(self, user_obj, tasks):
+        client = self.client_for(user_obj)
+        first = client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            second = client.get(self.url)
+        # Only the paginator's COUNT touches the task table.
+        [sql] = task_queries(context)
+        assert "COUNT" in sql
+        assert rows(second) == rows(first)
+
+    def test_writes_invalidate(
+        self, user_obj, tasks, django_capture_on_commit_callbacks
+    ):
+        client = self.client_for(user_obj)
+        assert b'class="done"' not in client.get(self.url).content
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("todo:toggle_task", kwargs={"pk": tasks[2].id})
+            )
+        # Done tasks come first.
+        response = client.get(self.url)
+        assert rows(response) == ["task 2", "task 0"]
+        assert b'class="done"' in response.content
+
+    def test_cached_page_carries_a_fresh_csrf_token(self, user_obj, tasks):
+        self.client_for(user_obj).get(self.url)
+
+        client = self.client_for(user_obj, enforce_csrf_checks=True)
+        content = client.get(self.url).content.decode()
+        # The token of the list form, rendered outside the cached fragment.
+        token = re.findall(
+            r'name="csrfmiddlewaretoken" value="([^"]+)"', content
+        )[-1]
+        response = client.post(
+            reverse("todo:toggle_task", kwargs={"pk": tasks[0].id}),
+            {"csrfmiddlewaretoken": token},
+        )
+        assert response.status_code == 302
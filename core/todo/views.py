@@ -1,30 +1,110 @@
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import CreateView, DeleteView, ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.conf import settings
+from django.urls import reverse, reverse_lazy
+from .cache import get_task_list_cache_timeout, get_task_version
 from .models import Task
 from .forms import TaskForm
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 
-class TaskCreateView(LoginRequiredMixin, CreateView):
+def url_template(name):
+    """
+    Return the (prefix, suffix) around the pk in the URL of a task view, so
+    templates can build the URL of every row without reversing it.
+    """
+    prefix, _, suffix = reverse(name, kwargs={"pk": 0}).rpartition("0")
+    return prefix, suffix
+
+
+def get_task_urls():
+    return {
+        "edit": url_template("todo:edit_task"),
+        "delete": url_template("todo:delete_task"),
+        "toggle": url_template("todo:toggle_task"),
+    }
+
+
+class PartialResponseMixin:
+    """
+    Lets a task mutation answer with only the affected task's <li>, or an
+    empty 204 for a deletion, instead of redirecting to the whole list.
+
+    A partial is requested with the HX-Request header, as sent by htmx, or
+    with the `partial` query parameter.
+    """
+
+    partial_template_name = "todo/partials/task_item.html"
+    partial_query_param = "partial"
+
+    def is_partial(self):
+        return (
+            self.request.headers.get("HX-Request") == "true"
+            or self.partial_query_param in self.request.GET
+        )
+
+    def render_task_item(self, task):
+        return render(
+            self.request,
+            self.partial_template_name,
+            {"task": task, "task_urls": get_task_urls()},
+        )
+
+    def render_form_errors(self, form):
+        return HttpResponse(form.errors.as_ul(), status=422)
+
+
+class TaskCreateView(LoginRequiredMixin, PartialResponseMixin, CreateView):
     model = Task
     fields = ["title"]
     success_url = reverse_lazy("todo:list_task")
 
     def form_valid(self, form):
         form.instance.user = self.request.user
+        if self.is_partial():
+            self.object = form.save()
+            return self.render_task_item(self.object)
         return super(TaskCreateView, self).form_valid(form)
 
+    def form_invalid(self, form):
+        if self.is_partial():
+            return self.render_form_errors(form)
+        return super().form_invalid(form)
+
 
 class TaskListView(ListView, LoginRequiredMixin):
+    """
+    Paginated list of the user's tasks.
+
+    Each page is rendered once per version of the user's tasks and then
+    served from the template fragment cache, so only the page count is
+    queried until a task changes.
+    """
+
     model = Task
     template_name = "todo/main.html"
     context_object_name = "tasks"
+    ordering = ["-is_done", "id"]
+
+    def get_paginate_by(self, queryset):
+        return getattr(settings, "TODO_WEB_PAGE_SIZE", 50)
 
     def get_queryset(self):
-        return Task.objects.filter(user=self.request.user)
+        return (
+            Task.objects.filter(user_id=self.request.user.id)
+            .order_by(*self.ordering)
+            .values("id", "title", "is_done")
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["task_version"] = get_task_version(self.request.user.id)
+        context["cache_timeout"] = get_task_list_cache_timeout()
+        context["task_urls"] = get_task_urls()
+        return context
 
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
@@ -32,7 +112,7 @@ class TaskListView(ListView, LoginRequiredMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
-class TaskDeleteView(LoginRequiredMixin, DeleteView):
+class TaskDeleteView(LoginRequiredMixin, PartialResponseMixin, DeleteView):
     model = Task
     context_object_name = "task"
     success_url = reverse_lazy("todo:list_task")
@@ -40,11 +120,17 @@ class TaskDeleteView(LoginRequiredMixin, DeleteView):
     def get(self, request, *args, **kwargs):
         return self.post(request, *args, **kwargs)
 
+    def form_valid(self, form):
+        if self.is_partial():
+            self.object.delete()
+            return HttpResponse(status=204)
+        return super().form_valid(form)
+
     def get_queryset(self):
         return self.model.objects.filter(user=self.request.user)
 
 
-class TaskUpdateView(LoginRequiredMixin, View):
+class TaskUpdateView(LoginRequiredMixin, PartialResponseMixin, View):
     def get(self, request, pk):
         task = get_object_or_404(Task, pk=pk, user=request.user)
         form = TaskForm(instance=task)
@@ -54,17 +140,27 @@ class TaskUpdateView(LoginRequiredMixin, View):
         task = get_object_or_404(Task, pk=pk, user=request.user)
         form = TaskForm(request.POST, instance=task)
         if form.is_valid():
-            form.save()
+            # Only write the columns the form changed.
+            if form.has_changed():
+                form.instance.save(
+                    update_fields=form.changed_data + ["updated_date"]
+                )
+            if self.is_partial():
+                return self.render_task_item(form.instance)
             return redirect("todo:list_task")
+        if self.is_partial():
+            return self.render_form_errors(form)
         return render(request, "todo/edit_task.html", {"form": form})
 
 
-class ToggleTaskUpdateView(LoginRequiredMixin, View):
+class ToggleTaskUpdateView(LoginRequiredMixin, PartialResponseMixin, View):
 
     def post(self, request, pk):
-        task = get_object_or_404(Task, pk=pk, user=request.user)
-        task.is_done = not task.is_done
-        task.save()
+        if Task.objects.toggle(pk, request.user.id) is None:
+            raise Http404("No Task matches the given query.")
+        if self.is_partial():
+            task = Task.objects.values("id", "title", "is_done").get(pk=pk)
+            return self.render_task_item(task)
         return redirect("todo:list_task")
 
 
@@ -0,0 +1,481 @@
+import asyncio
+import logging
+from collections import deque, namedtuple
+from hashlib import md5
+from threading import Lock
+from time import monotonic, sleep, time
+from weakref import WeakKeyDictionary
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+WEATHER_API_DEFAULTS = {
+    "URL": "http://api.openweathermap.org/data/2.5/weather",
+    "KEY": "",
+    "CONNECT_TIMEOUT": 2.0,
+    "READ_TIMEOUT": 5.0,
+    "MAX_CONNECTIONS": 20,
+    "MAX_KEEPALIVE_CONNECTIONS": 10,
+    "TIMEOUT": 60 * 20,
+    "STALE_TIMEOUT": 60 * 60,
+    "NOT_FOUND_TIMEOUT": 60 * 5,
+    "LAST_GOOD_TIMEOUT": 60 * 60 * 24,
+    "LOCK_TIMEOUT": 10,
+    "BREAKER_WINDOW": 30,
+    "BREAKER_MIN_CALLS": 10,
+    "BREAKER_FAILURE_RATE": 0.5,
+    "BREAKER_RESET_TIMEOUT": 30,
+}
+
+NOT_FOUND = (404, {"error": "City not found"})
+UNAVAILABLE = (503, {"error": "Weather service unavailable"})
+# The lookup results the circuit breaker counts as successful calls, an
+# unknown city is a valid answer. Rejected keys, exhausted quotas and
+# server errors all count as failures.
+SUCCESS_STATUSES = (200, 404)
+
+ENTRY_KEY = "todo:weather:{}"
+LOCK_KEY = "todo:weather:lock:{}"
+REFRESH_KEY = "todo:weather:refresh:{}"
+LAST_GOOD_KEY = "todo:weather:last:{}"
+# how often a request waiting for another one's upstream call polls
+LOCK_POLL_INTERVAL = 0.05
+
+WeatherKeys = namedtuple("WeatherKeys", "entry lock refresh last_good")
+
+
+def get_weather_setting(name):
+    return getattr(settings, "WEATHER_API", {}).get(
+        name, WEATHER_API_DEFAULTS[name]
+    )
+
+
+def get_params(city_name):
+    return {
+        "q": city_name,
+        "appid": get_weather_setting("KEY"),
+        "units": "metric",
+    }
+
+
+def parse_response(status_code, get_json):
+    """
+    Map an upstream response to the (status, data) pair we answer with.
+
+    Only a 404 means the city is unknown. Any other error, e.g. a 401 for
+    a bad API key or a 429 once the quota is used up, says nothing about
+    the city and is answered as the service being unavailable.
+    """
+    if status_code == 200:
+        return 200, get_json()
+    if status_code == 404:
+        return NOT_FOUND
+    return UNAVAILABLE
+
+
+class CircuitBreaker:
+    """
+    Stops calling the weather API while it keeps failing.
+
+    The outcomes of the calls made in the last BREAKER_WINDOW seconds are
+    kept. Once at least BREAKER_MIN_CALLS of them ran and the share of
+    failures reaches BREAKER_FAILURE_RATE, the breaker opens and calls are
+    rejected without touching the network. After BREAKER_RESET_TIMEOUT
+    seconds it is half open: a single probe goes through, closing the
+    breaker if it succeeds and opening it again if it fails.
+
+    The state lives in process memory, so every worker process trips its
+    own breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.state = self.CLOSED
+        self.outcomes = deque()
+        self.opened_at = 0
+        self.probing = False
+        self.calls = self.failures = self.rejected = self.opened = 0
+
+    def allow(self):
+        """
+        Return whether a call may go to the upstream now.
+        """
+        with self.lock:
+            if self.state == self.OPEN:
+                reset_timeout = get_weather_setting("BREAKER_RESET_TIMEOUT")
+                if monotonic() - self.opened_at < reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self.probing:
+                    self.rejected += 1
+                    return False
+                self.probing = True
+            return True
+
+    def record(self, success):
+        """
+        Record the outcome of a call let through by allow().
+        """
+        now = monotonic()
+        with self.lock:
+            self.calls += 1
+            self.failures += not success
+            if self.state == self.HALF_OPEN:
+                self.probing = False
+                if success:
+                    self.state = self.CLOSED
+                else:
+                    self.open(now)
+                return
+            self.outcomes.append((now, success))
+            window = get_weather_setting("BREAKER_WINDOW")
+            while self.outcomes and self.outcomes[0][0] <= now - window:
+                self.outcomes.popleft()
+            calls = len(self.outcomes)
+            failed = sum(not ok for _, ok in self.outcomes)
+            if (
+                self.state == self.CLOSED
+                and calls >= get_weather_setting("BREAKER_MIN_CALLS")
+                and failed >= calls * get_weather_setting(
+                    "BREAKER_FAILURE_RATE"
+                )
+            ):
+                self.open(now)
+
+    def open(self, now):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.opened += 1
+        self.outcomes.clear()
+        logger.warning("Weather circuit breaker opened")
+
+    def stats(self):
+        """
+        Return the breaker state and its call, failure, rejection and
+        opening counters.
+        """
+        with self.lock:
+            return {
+                "state": self.state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "opened": self.opened,
+                "window_calls": len(self.outcomes),
+                "window_failures": sum(not ok for _, ok in self.outcomes),
+            }
+
+
+weather_breaker = CircuitBreaker()
+
+
+_session = None
+_session_lock = Lock()
+
+
+def get_session():
+    """
+    Return the process wide requests session, whose connection pool keeps
+    upstream connections alive between calls.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_maxsize=get_weather_setting("MAX_CONNECTIONS")
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def fetch_weather(city_name):
+    """
+    Fetch the weather of a city with the pooled session and strict
+    connect/read timeouts, through the circuit breaker.
+
+    Returns:
+        tuple: The HTTP status and the data to respond with.
+    """
+    if not weather_breaker.allow():
+        return UNAVAILABLE
+    timeout = (
+        get_weather_setting("CONNECT_TIMEOUT"),
+        get_weather_setting("READ_TIMEOUT"),
+    )
+    result = UNAVAILABLE
+    try:
+        response = get_session().get(
+            get_weather_setting("URL"),
+            params=get_params(city_name),
+            timeout=timeout,
+        )
+        result = parse_response(response.status_code, response.json)
+    except (requests.RequestException, ValueError):
+        logger.warning("Weather lookup for %r failed", city_name, exc_info=True)
+    finally:
+        weather_breaker.record(result[0] in SUCCESS_STATUSES)
+    return result
+
+
+# One client and one semaphore per event loop: httpx clients and asyncio
+# primitives must not be shared between loops.
+_async_clients = WeakKeyDictionary()
+
+
+async def close_with_loop(client):
+    """
+    Close a client once its event loop shuts down.
+
+    The loop finalizes the async generators it still tracks before closing,
+    which runs the finally clause here. Under WSGI every async view runs on
+    a loop of its own, whose client would otherwise keep its connections
+    open after the request.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def get_async_client():
+    """
+    Return the pooled HTTP client of the running event loop and the
+    semaphore bounding concurrent upstream calls on that loop.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        limits = httpx.Limits(
+            max_connections=get_weather_setting("MAX_CONNECTIONS"),
+            max_keepalive_connections=get_weather_setting(
+                "MAX_KEEPALIVE_CONNECTIONS"
+            ),
+        )
+        timeout = httpx.Timeout(
+            get_weather_setting("READ_TIMEOUT"),
+            connect=get_weather_setting("CONNECT_TIMEOUT"),
+        )
+        client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        closer = close_with_loop(client)
+        await closer.__anext__()
+        # The loop only tracks the generator weakly, it is kept with the
+        # client.
+        _async_clients[loop] = (
+            client,
+            asyncio.Semaphore(get_weather_setting("MAX_CONNECTIONS")),
+            closer,
+        )
+    client, semaphore, _ = _async_clients[loop]
+    return client, semaphore
+
+
+async def afetch_weather(city_name):
+    """
+    Async version of fetch_weather, running on the loop's pooled client.
+
+    At most MAX_CONNECTIONS upstream calls run at once per loop; further
+    callers wait on the semaphore instead of opening more connections.
+    """
+    if not weather_breaker.allow():
+        return UNAVAILABLE
+    client, semaphore = await get_async_client()
+    result = UNAVAILABLE
+    try:
+        async with semaphore:
+            response = await client.get(
+                get_weather_setting("URL"), params=get_params(city_name)
+            )
+        result = parse_response(response.status_code, response.json)
+    except (httpx.HTTPError, ValueError):
+        logger.warning("Weather lookup for %r failed", city_name, exc_info=True)
+    finally:
+        weather_breaker.record(result[0] in SUCCESS_STATUSES)
+    return result
+
+
+def normalize_city(city_name):
+    """
+    Return the form of a city name the weather cache is keyed on, so that
+    "London", "london" and " LONDON " share one entry.
+    """
+    return " ".join(city_name.split()).casefold()
+
+
+def weather_cache_keys(city_name):
+    """
+    Return the entry, lock, refresh and last known good keys of a city.
+    """
+    digest = md5(normalize_city(city_name).encode()).hexdigest()
+    return WeatherKeys(
+        ENTRY_KEY.format(digest),
+        LOCK_KEY.format(digest),
+        REFRESH_KEY.format(digest),
+        LAST_GOOD_KEY.format(digest),
+    )
+
+
+def make_entries(city_name, status_code, data):
+    """
+    Build the cache entries of a lookup result.
+
+    Found cities stay fresh for TIMEOUT seconds and are then served stale
+    for up to STALE_TIMEOUT more while they are refreshed; their data is
+    also kept for LAST_GOOD_TIMEOUT seconds to answer with while the
+    upstream is down. Unknown cities are cached for NOT_FOUND_TIMEOUT
+    seconds. Failed lookups are not cached.
+
+    Returns:
+        dict: The (value, timeout) pairs to set, by key.
+    """
+    keys = weather_cache_keys(city_name)
+    if status_code == 200:
+        fresh = get_weather_setting("TIMEOUT")
+        timeout = fresh + get_weather_setting("STALE_TIMEOUT")
+    elif status_code == 404:
+        fresh = timeout = get_weather_setting("NOT_FOUND_TIMEOUT")
+    else:
+        return {}
+    entry = {"status": status_code, "data": data, "expires": time() + fresh}
+    entries = {keys.entry: (entry, timeout)}
+    if status_code == 200:
+        entries[keys.last_good] = (
+            data, get_weather_setting("LAST_GOOD_TIMEOUT")
+        )
+    return entries
+
+
+def store_weather(city_name, status_code, data):
+    entries = make_entries(city_name, status_code, data)
+    for key, (value, timeout) in entries.items():
+        cache.set(key, value, timeout)
+
+
+def degrade(status_code, data, last_good):
+    """
+    Replace a failed lookup with the last known good data of the city.
+
+    Returns:
+        tuple: The HTTP status, the data and whether it is degraded.
+    """
+    if status_code == 503 and last_good is not None:
+        return 200, last_good, True
+    return status_code, data, False
+
+
+def refresh_weather(city_name):
+    """
+    Fetch a city again and update its entry, keeping the stale one when
+    the upstream call fails. Releases the refresh lock taken by
+    schedule_refresh.
+    """
+    refresh_key = weather_cache_keys(city_name).refresh
+    try:
+        store_weather(city_name, *fetch_weather(city_name))
+    finally:
+        cache.delete(refresh_key)
+
+
+def schedule_refresh(city_name):
+    """
+    Queue the background refresh of a stale entry, at most one per city
+    at a time.
+    """
+    refresh_key = weather_cache_keys(city_name).refresh
+    if not cache.add(refresh_key, 1, get_weather_setting("LOCK_TIMEOUT")):
+        return
+    from todo.tasks import refresh_weather_cache
+
+    try:
+        refresh_weather_cache.delay(city_name)
+    except Exception:
+        logger.warning("Scheduling a weather refresh failed", exc_info=True)
+        cache.delete(refresh_key)
+
+
+def get_weather(city_name):
+    """
+    Look a city up through the weather cache.
+
+    A fresh entry is returned as is. A stale one is returned while a
+    Celery task refreshes it. On a miss only the request holding the lock
+    calls the upstream; concurrent requests for the same city wait for its
+    entry, for at most LOCK_TIMEOUT seconds, before calling it themselves.
+    When the upstream is unavailable, the last known good data of the city
+    is returned instead, flagged as degraded.
+
+    Returns:
+        tuple: The HTTP status, the data to respond with and whether it
+        is degraded.
+    """
+    city_name = normalize_city(city_name)
+    keys = weather_cache_keys(city_name)
+    lock_timeout = get_weather_setting("LOCK_TIMEOUT")
+    deadline = monotonic() + lock_timeout
+    while True:
+        entry = cache.get(keys.entry)
+        if entry is not None:
+            if entry["expires"] <= time():
+                schedule_refresh(city_name)
+            return entry["status"], entry["data"], False
+        if cache.add(keys.lock, 1, lock_timeout):
+            break
+        if monotonic() >= deadline:
+            status_code, data = fetch_weather(city_name)
+            return degrade(status_code, data, cache.get(keys.last_good))
+        sleep(LOCK_POLL_INTERVAL)
+    try:
+        status_code, data = fetch_weather(city_name)
+        store_weather(city_name, status_code, data)
+    finally:
+        cache.delete(keys.lock)
+    return degrade(status_code, data, cache.get(keys.last_good))
+
+
+async def aget_weather(city_name):
+    """
+    Async version of get_weather, waiting on the event loop instead of
+    blocking while another request holds the lock.
+    """
+    city_name = normalize_city(city_name)
+    keys = weather_cache_keys(city_name)
+    lock_timeout = get_weather_setting("LOCK_TIMEOUT")
+    deadline = monotonic() + lock_timeout
+    while True:
+        entry = await cache.aget(keys.entry)
+        if entry is not None:
+            if entry["expires"] <= time():
+                await sync_to_async(schedule_refresh)(city_name)
+            return entry["status"], entry["data"], False
+        if await cache.aadd(keys.lock, 1, lock_timeout):
+            break
+        if monotonic() >= deadline:
+            status_code, data = await afetch_weather(city_name)
+            return degrade(
+                status_code, data, await cache.aget(keys.last_good)
+            )
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+    try:
+        status_code, data = await afetch_weather(city_name)
+        entries = make_entries(city_name, status_code, data)
+        for key, (value, timeout) in entries.items():
+            await cache.aset(key, value, timeout)
+    finally:
+        await cache.adelete(keys.lock)
+    return degrade(status_code, data, await cache.aget(keys.last_good))